@@ -0,0 +1,162 @@
+# benchmarks/mock_api.py
+#Purpose: Local stand-in for the AQICN and OpenWeatherMap endpoints with configurable latency and failure rate.
+
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+def _seed(text):
+    return zlib.crc32(str(text).strip().lower().encode())
+
+
+def _reading(key, hour=None):
+    """Deterministic pollutant levels per city / coordinate, varying by the hour."""
+    rng = random.Random(_seed(key) + int(time.time() // 3600 if hour is None else hour))
+    pm25 = round(rng.uniform(5, 250), 1)
+    return {
+        "pm2_5": pm25,
+        "pm10": round(pm25 * rng.uniform(1.1, 2.0), 1),
+        "no2": round(rng.uniform(5, 80), 2),
+        "so2": round(rng.uniform(2, 40), 2),
+        "co": round(rng.uniform(100, 900), 2),
+        "o3": round(rng.uniform(10, 120), 2),
+        "nh3": round(rng.uniform(1, 20), 2),
+        "no": round(rng.uniform(0, 10), 2),
+    }
+
+
+class MockAPI:
+    """
+    ThreadingHTTPServer answering:
+      /feed/<city>/                 AQICN feed
+      /geo/1.0/direct?q=<city>      OWM geocoding
+      /data/2.5/air_pollution       OWM air pollution (lat/lon)
+      /data/2.5/air_pollution/history   OWM hourly history (lat/lon/start/end)
+    Every request sleeps latency_ms ± jitter_ms; failure_rate of them fail
+    (HTTP 500 or an AQICN "Unknown station" error).
+    """
+
+    def __init__(self, latency_ms=50, jitter_ms=10, failure_rate=0.0, host="127.0.0.1", port=0, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.host = host
+        self.port = port
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "failures": 0}
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def _roll(self):
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            failed = self._rng.random() < self.failure_rate
+            if failed:
+                self.stats["failures"] += 1
+        time.sleep(delay)
+        return failed
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+                failed = api._roll()
+
+                if parts[:1] == ["feed"] and len(parts) == 2:
+                    if failed:
+                        return self._send(200, {"status": "error", "data": "Unknown station"})
+                    comps = _reading(parts[1])
+                    iaqi = {("pm25" if k == "pm2_5" else k): {"v": v} for k, v in comps.items()}
+                    return self._send(200, {"status": "ok", "data": {
+                        "aqi": int(min(500, comps["pm2_5"] * 1.3)),
+                        "time": {"s": time.strftime("%Y-%m-%d %H:00:00")},
+                        "iaqi": iaqi,
+                    }})
+
+                if failed:
+                    return self._send(500, {"error": "mock failure"})
+                if parts == ["geo", "1.0", "direct"]:
+                    seed = _seed(query.get("q", ""))
+                    return self._send(200, [{"name": query.get("q"), "lat": 8 + seed % 2900 / 100,
+                                             "lon": 68 + seed % 2900 / 100}])
+                if parts == ["data", "2.5", "air_pollution"]:
+                    comps = _reading(f"{query.get('lat')},{query.get('lon')}")
+                    return self._send(200, {"list": [{
+                        "dt": int(time.time() // 3600 * 3600),
+                        "main": {"aqi": 1 + int(comps["pm2_5"] // 60) % 5},
+                        "components": comps,
+                    }]})
+                if parts == ["data", "2.5", "air_pollution", "history"]:
+                    key = f"{query.get('lat')},{query.get('lon')}"
+                    first, last = int(query.get("start", 0)) // 3600, int(query.get("end", 0)) // 3600
+                    entries = []
+                    for hour in range(first, last + 1):
+                        comps = _reading(key, hour)
+                        entries.append({"dt": hour * 3600, "main": {"aqi": 1 + int(comps["pm2_5"] // 60) % 5},
+                                        "components": comps})
+                    return self._send(200, {"list": entries})
+                return self._send(404, {"error": f"unknown path {url.path}"})
+
+            def log_message(self, fmt, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Mock AQICN / OWM API server")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    api = MockAPI(args.latency_ms, failure_rate=args.failure_rate, port=args.port)
+    print(f"🧪 Mock API on {api.start()}  (export AQICN_BASE_URL / OWM_BASE_URL to use it)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        api.stop()
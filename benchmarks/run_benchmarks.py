@@ -0,0 +1,189 @@
+# benchmarks/run_benchmarks.py
+#Purpose: Times every public entry point against scaled synthetic data and a mock API, and writes a comparable JSON report.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.mock_api import MockAPI
+from benchmarks.synthetic import SCALES, city_names, generate_workspace, reset_workspace
+
+WORKSPACE = os.path.join(REPO_ROOT, "benchmarks", "workspace")
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+SLOWER_THRESHOLD = 1.2      # flag entry points whose median got 20% slower than the baseline
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _summarize(samples_ms, errors):
+    ordered = sorted(samples_ms)
+    return {
+        "calls": len(samples_ms),
+        "errors": errors,
+        "first_ms": round(samples_ms[0], 3) if samples_ms else None,
+        "min_ms": round(ordered[0], 3) if ordered else None,
+        "median_ms": round(statistics.median(ordered), 3) if ordered else None,
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3) if ordered else None,
+        "mean_ms": round(statistics.fmean(ordered), 3) if ordered else None,
+    }
+
+
+def _time_calls(func, args_list, verbose=False):
+    """Call func(*args) for each args tuple with stdout silenced; per-call wall time in ms."""
+    samples, errors = [], 0
+    for args in args_list:
+        sink = io.StringIO()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(sink):
+                func(*args)
+        except Exception as e:
+            errors += 1
+            if verbose:
+                print(f"   ⚠️ {func.__name__}{args}: {e}")
+        samples.append((time.perf_counter() - start) * 1000)
+    return _summarize(samples, errors)
+
+
+def run(scale="small", sample=25, latency_ms=50, failure_rate=0.0, workspace=WORKSPACE, seed=42,
+        force=False, verbose=False):
+    """Generate (or reuse) the workspace, start the mock API, time the entry points. Returns the report dict."""
+    import matplotlib
+    matplotlib.use("Agg")
+
+    params = SCALES[scale]
+    manifest = generate_workspace(workspace, seed=seed, force=force, **params)
+    reset_workspace(workspace, manifest)
+    cities = random.Random(seed).sample(city_names(params["cities"]), min(sample, params["cities"]))
+    calls = [(c,) for c in cities]
+
+    cwd = os.getcwd()
+    os.chdir(workspace)     # every project path is relative to the working directory
+    api = MockAPI(latency_ms=latency_ms, failure_rate=failure_rate, seed=seed)
+    try:
+        api.start()
+        setup = {}
+
+        # Project modules are imported only now, from inside the workspace
+        start = time.perf_counter()
+        from common import metrics
+        from section1Pollution.scripts import fetch_pollution, response_cache
+        from section1Pollution.scripts.pollution_store import get_store
+        from section1Pollution.scripts.analyze_pollution import analyze_latest
+        from section1Pollution.scripts.suggest_measures import suggest_measures
+        from section2_Bioknowledge.scripts2.analyze_bioknowledge import analyze_city_health
+        from section3_LE.scripts3.correlate_life_expectancy import correlate_life_expectancy
+        from section4_SoilFertility.scripts4.predict_soil_fertility import predict_soil_fertility
+        setup["import_s"] = time.perf_counter() - start
+
+        metrics.reset()
+        fetch_pollution.AQICN_BASE_URL = api.base_url
+        fetch_pollution.OWM_BASE_URL = api.base_url
+
+        # First store open migrates the synthetic pollution CSV
+        start = time.perf_counter()
+        store = get_store()
+        store.count()
+        setup["store_open_s"] = time.perf_counter() - start
+
+        results = {}
+        print(f"⏱️ Timing {len(calls)} calls per entry point (mock latency {latency_ms} ms, "
+              f"failure rate {failure_rate:.0%})")
+
+        response_cache.configure_cache(enabled=False)
+        results["fetch_air_quality"] = _time_calls(fetch_pollution.fetch_air_quality, calls, verbose)
+        response_cache.configure_cache(enabled=True)
+        _time_calls(fetch_pollution.fetch_air_quality, calls)            # fill the response cache
+        results["fetch_air_quality (cached)"] = _time_calls(fetch_pollution.fetch_air_quality, calls, verbose)
+
+        results["analyze_latest"] = _time_calls(analyze_latest, calls, verbose)
+        results["suggest_measures"] = _time_calls(suggest_measures, calls, verbose)
+        results["analyze_city_health"] = _time_calls(
+            lambda c: analyze_city_health(c, headless=True), calls, verbose)
+        results["correlate_life_expectancy"] = _time_calls(correlate_life_expectancy, calls, verbose)
+        results["predict_soil_fertility"] = _time_calls(predict_soil_fertility, calls, verbose)
+        api_stats = dict(api.stats)
+        hot_paths = metrics.snapshot()
+    finally:
+        api.stop()
+        os.chdir(cwd)
+
+    return {
+        "meta": {
+            "finished_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "params": {"scale": scale, **manifest["params"], "sample": len(calls),
+                   "latency_ms": latency_ms, "failure_rate": failure_rate},
+        "setup": {k: round(v, 3) for k, v in setup.items()},
+        "mock_api": api_stats,
+        "results": results,
+        "metrics": hot_paths,
+    }
+
+
+def print_report(report, baseline=None):
+    print(f"\n📊 Benchmark ({report['params']['scale']}, commit {report['meta']['commit']})")
+    for k, v in report["setup"].items():
+        print(f"   ➤ {k:<30} {v:9.3f}s")
+    print(f"\n   {'entry point':<30} {'median':>10} {'p95':>10} {'first':>10} {'errors':>7}"
+          + (f" {'vs base':>9}" if baseline else ""))
+    for name, r in report["results"].items():
+        line = f"   {name:<30} {r['median_ms']:>8.2f}ms {r['p95_ms']:>8.2f}ms {r['first_ms']:>8.2f}ms {r['errors']:>7}"
+        base = (baseline or {}).get("results", {}).get(name)
+        if base and base.get("median_ms"):
+            ratio = r["median_ms"] / base["median_ms"]
+            flag = " ⚠️ slower" if ratio >= SLOWER_THRESHOLD else ""
+            line += f" {ratio:>8.2f}×{flag}"
+        print(line)
+
+
+def save_report(report, results_dir=RESULTS_DIR):
+    os.makedirs(results_dir, exist_ok=True)
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(results_dir, f"bench_{report['params']['scale']}_{stamp}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=1)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scale benchmarks for the public entry points")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--sample", type=int, default=25, help="cities timed per entry point")
+    parser.add_argument("--latency-ms", type=float, default=50, help="mock API latency per request")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of mock API requests that fail")
+    parser.add_argument("--workspace", default=WORKSPACE)
+    parser.add_argument("--regenerate", action="store_true", help="rebuild the synthetic workspace")
+    parser.add_argument("--compare", help="earlier report JSON to compare medians against")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    report = run(args.scale, args.sample, args.latency_ms, args.failure_rate, args.workspace,
+                 force=args.regenerate, verbose=args.verbose)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"\n📄 Report saved at: {save_report(report)}")
@@ -0,0 +1,160 @@
+# benchmarks/startup.py
+#Purpose: Measures cold-start import cost of main.py and of each section in fresh interpreters, against a budget and a baseline.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.run_benchmarks import RESULTS_DIR, SLOWER_THRESHOLD, _git_commit
+from main import SECTIONS
+
+# Reaching the city prompt may cost at most this fraction of importing every section
+PROMPT_BUDGET = 0.10
+TOP_MODULES = 5         # heaviest top-level imports listed per target
+
+# Heavy packages a target may pull in at import time; anything else from HEAVY_PACKAGES fails the check.
+# sklearn / joblib only load with the first model, matplotlib only with the first chart.
+HEAVY_PACKAGES = {"pandas", "numpy", "requests", "joblib", "sklearn", "matplotlib", "scipy"}
+ALLOWED_PACKAGES = {
+    "prompt": set(),
+    "pollution": {"pandas", "numpy", "requests"},
+    "health": {"pandas", "numpy"},
+    "le": {"pandas", "numpy"},
+    "soil": {"pandas", "numpy"},
+    "all": {"pandas", "numpy", "requests"},
+}
+
+
+def _targets():
+    targets = {"prompt": "import main"}
+    for name in SECTIONS:
+        targets[name] = f"import main; main.load_section({name!r})"
+    targets["all"] = "import main; [main.load_section(s) for s in main.SECTIONS]"
+    return targets
+
+
+def _parse_importtime(stderr):
+    """Top-level modules by cumulative import time (µs) from `python -X importtime` output."""
+    heaviest = {}
+    for line in stderr.splitlines():
+        parts = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        # Nested imports are indented under their importer; keep first-level entries only
+        if parts[2].startswith("  "):
+            continue
+        name = parts[2].strip()
+        heaviest[name] = heaviest.get(name, 0) + int(parts[1])
+    return sorted(heaviest.items(), key=lambda kv: kv[1], reverse=True)[:TOP_MODULES]
+
+
+def measure(code, repeat=5):
+    """
+    Wall time of a fresh interpreter running code (min / median over repeat runs),
+    its heaviest imports and the heavy packages it left loaded.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    probe = code + "; import sys; print(' '.join(sorted({m.split('.')[0] for m in sys.modules})))"
+    profile = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], cwd=REPO_ROOT, check=True,
+                             capture_output=True, text=True)
+    loaded = set(profile.stdout.split())
+    return {
+        "min_ms": round(min(samples), 2),
+        "median_ms": round(statistics.median(samples), 2),
+        "top_imports_ms": [[name, round(us / 1000, 2)] for name, us in _parse_importtime(profile.stderr)],
+        "heavy_packages": sorted(loaded & HEAVY_PACKAGES),
+    }
+
+
+def run(repeat=5):
+    baseline_ms = measure("pass", repeat)["min_ms"]      # bare interpreter start, subtracted below
+    results = {}
+    for name, code in _targets().items():
+        r = measure(code, repeat)
+        r["import_ms"] = round(max(r["min_ms"] - baseline_ms, 0.0), 2)
+        results[name] = r
+    return {
+        "meta": {
+            "finished_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "interpreter_ms": baseline_ms,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def check(report, baseline=None):
+    """List of budget / regression failures (empty when everything is within limits)."""
+    results = report["results"]
+    full = results["all"]["import_ms"] or 1e-9
+    failures = []
+    if results["prompt"]["import_ms"] > PROMPT_BUDGET * full:
+        failures.append(f"prompt: {results['prompt']['import_ms']:.1f} ms is over "
+                        f"{PROMPT_BUDGET:.0%} of a full import ({full:.1f} ms)")
+    for name, r in results.items():
+        extra = set(r["heavy_packages"]) - ALLOWED_PACKAGES.get(name, HEAVY_PACKAGES)
+        if extra:
+            failures.append(f"{name}: imports {', '.join(sorted(extra))} at startup")
+    for name, r in results.items():
+        base = (baseline or {}).get("results", {}).get(name)
+        if base and base.get("import_ms") and r["import_ms"] / base["import_ms"] >= SLOWER_THRESHOLD:
+            failures.append(f"{name}: {r['import_ms']:.1f} ms vs {base['import_ms']:.1f} ms in the baseline")
+    return failures
+
+
+def print_report(report, baseline=None):
+    print(f"\n🚀 Startup (commit {report['meta']['commit']}, interpreter {report['meta']['interpreter_ms']:.1f} ms)")
+    print(f"   {'target':<12} {'import':>10} {'median':>10}" + (f" {'vs base':>9}" if baseline else "")
+          + "   heavy packages / heaviest imports (ms)")
+    for name, r in report["results"].items():
+        line = f"   {name:<12} {r['import_ms']:>8.1f}ms {r['median_ms']:>8.1f}ms"
+        base = (baseline or {}).get("results", {}).get(name)
+        if baseline:
+            line += f" {r['import_ms'] / base['import_ms']:>8.2f}×" if base and base.get("import_ms") else f" {'':>9}"
+        line += f"   [{', '.join(r['heavy_packages'])}] " + ", ".join(
+            f"{m} {ms:.0f}" for m, ms in r["top_imports_ms"][:3])
+        print(line)
+
+
+def save_report(report, results_dir=RESULTS_DIR):
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"startup_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=1)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start import benchmark for main.py and each section")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per target")
+    parser.add_argument("--compare", help="earlier startup report JSON to compare against")
+    args = parser.parse_args()
+
+    report = run(args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"\n📄 Report saved at: {save_report(report)}")
+
+    failures = check(report, baseline)
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Startup within budget")
@@ -0,0 +1,175 @@
+# benchmarks/synthetic.py
+#Purpose: Builds a scaled synthetic copy of the project's data files in a separate workspace (same relative layout).
+
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+POLLUTION_FILE = "section1Pollution/section1-Pollution/data/pollution_data.csv"
+PLANTATION_DATA_FILE = "section1Pollution/section1-Pollution/data/plantation_training_data.csv"
+HEALTH_FILE = "section2_Bioknowledge/data/health_dataset_expanded.csv"
+HEALTH_RANGES_FILE = "section2_Bioknowledge/utils/health_ranges.json"
+STATEWISE_LE_FILE = "section3_LE/data/state_life_expectancy_2017_21_india.csv"
+SOIL_FILE = "section4_SoilFertility/data/soil_fertility.csv"
+SOIL_MODEL_FILES = ["section4_SoilFertility/models/soil_fertility_model.pkl", "section4_SoilFertility/models/scaler.pkl"]
+
+# Copied unchanged: reference tables and the soil model trained on the real features
+COPIED_FILES = [HEALTH_RANGES_FILE, STATEWISE_LE_FILE, PLANTATION_DATA_FILE] + SOIL_MODEL_FILES
+
+SCALES = {
+    "small": {"cities": 1_000, "pollution_rows": 100_000, "soil_rows": 1_000},
+    "medium": {"cities": 10_000, "pollution_rows": 1_000_000, "soil_rows": 10_000},
+    "large": {"cities": 10_000, "pollution_rows": 10_000_000, "soil_rows": 10_000},
+}
+
+MANIFEST = "benchmark_manifest.json"
+
+# Written by the code under test; removed before each run so runs start from the same state
+RUN_STATE = [
+    "section1Pollution/section1-Pollution/data/pollution_store.sqlite",
+    "section1Pollution/section1-Pollution/data/pollution_store.sqlite-wal",
+    "section1Pollution/section1-Pollution/data/pollution_store.sqlite-shm",
+    "section1Pollution/section1-Pollution/data/geocode_index.json",
+    "section1Pollution/section1-Pollution/cache",
+    "section2_Bioknowledge/reports",
+    "section3_LE/reports",
+]
+CHUNK_ROWS = 1_000_000
+
+
+def city_names(n):
+    return [f"benchcity {i:05d}" for i in range(n)]
+
+
+def _states():
+    le = pd.read_csv(os.path.join(REPO_ROOT, STATEWISE_LE_FILE))
+    return sorted(s for s in le["State"].astype(str).str.strip().unique() if s.lower() != "india")
+
+
+def _write_pollution(path, cities, n_rows, rng):
+    """Hourly readings cycling through every city, written in 1M-row chunks."""
+    start = pd.Timestamp("2024-01-01 00:00:00")
+    n_cities = len(cities)
+    names = np.asarray(cities)
+    for offset in range(0, n_rows, CHUNK_ROWS):
+        idx = np.arange(offset, min(n_rows, offset + CHUNK_ROWS))
+        size = len(idx)
+        pm25 = rng.gamma(2.0, 40.0, size).round(1)
+        chunk = pd.DataFrame({
+            "city": names[idx % n_cities],
+            "time": (start + pd.to_timedelta(idx // n_cities, unit="h")).strftime("%Y-%m-%d %H:%M:%S"),
+            "co": rng.gamma(2.0, 150.0, size).round(2),
+            "no2": rng.gamma(2.0, 15.0, size).round(2),
+            "o3": rng.gamma(2.0, 30.0, size).round(2),
+            "pm2_5": pm25,
+            "pm10": (pm25 * rng.uniform(1.1, 2.0, size)).round(1),
+            "so2": rng.gamma(2.0, 8.0, size).round(2),
+            "aqi": np.minimum(500, pm25 * 1.3).round(0),
+            "source": np.where(rng.random(size) < 0.8, "AQICN", "OWM"),
+        })
+        chunk.to_csv(path, mode="w" if offset == 0 else "a", header=offset == 0, index=False)
+
+
+def _write_health(path, cities, rng):
+    n = len(cities)
+    states = _states()
+    pd.DataFrame({
+        "state": [states[i % len(states)] for i in range(n)],
+        "city": [c.title() for c in cities],
+        "avg_bp_sys": rng.normal(119.5, 2.2, n).round(2),
+        "avg_bp_dia": rng.normal(77.2, 1.6, n).round(2),
+        "avg_heart_rate": rng.normal(73.8, 1.7, n).round(3),
+        "avg_oxygen_level": rng.normal(96.7, 0.75, n).round(3),
+    }).to_csv(path, index=False)
+
+
+def _write_soil(path, cities, n_rows, rng):
+    """Districts reuse the city names (some repeated, like real district names across states)."""
+    header = pd.read_csv(os.path.join(REPO_ROOT, SOIL_FILE), nrows=0).columns
+    data = {header[0]: [cities[i % len(cities)].title() for i in range(n_rows)]}
+    for col in header[1:]:
+        values = np.clip(rng.normal(70, 25, n_rows), 0, 100).round(2)
+        values[rng.random(n_rows) < 0.02] = np.nan        # a few gaps, as in the real table
+        data[col] = values
+    pd.DataFrame(data).to_csv(path, index=False)
+
+
+def _train_plantation_model(workspace):
+    """Train the plantation model inside the workspace with the project's own pipeline."""
+    from section1Pollution.train_plantation_model import train_plantation_model
+    cwd = os.getcwd()
+    os.chdir(workspace)
+    try:
+        train_plantation_model(n_jobs=1)
+    finally:
+        os.chdir(cwd)
+
+
+def generate_workspace(workspace, cities=1_000, pollution_rows=100_000, soil_rows=1_000, seed=42, force=False):
+    """
+    Write synthetic pollution / health / soil tables (plus copied reference files and
+    models) under workspace with the repository's relative layout. Reuses an existing
+    workspace generated with the same parameters. Returns the manifest.
+    """
+    params = {"cities": cities, "pollution_rows": pollution_rows, "soil_rows": soil_rows, "seed": seed}
+    manifest_path = os.path.join(workspace, MANIFEST)
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("params") == params:
+            print(f"♻️ Reusing synthetic workspace at {workspace}")
+            return manifest
+
+    if os.path.exists(workspace):
+        shutil.rmtree(workspace)
+    for rel in [POLLUTION_FILE, HEALTH_FILE, SOIL_FILE] + COPIED_FILES:
+        os.makedirs(os.path.dirname(os.path.join(workspace, rel)), exist_ok=True)
+
+    rng = np.random.default_rng(seed)
+    names = city_names(cities)
+    timings = {}
+
+    start = time.perf_counter()
+    _write_pollution(os.path.join(workspace, POLLUTION_FILE), names, pollution_rows, rng)
+    timings["pollution_csv"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _write_health(os.path.join(workspace, HEALTH_FILE), names, rng)
+    _write_soil(os.path.join(workspace, SOIL_FILE), names, soil_rows, rng)
+    for rel in COPIED_FILES:
+        if os.path.exists(os.path.join(REPO_ROOT, rel)):
+            shutil.copyfile(os.path.join(REPO_ROOT, rel), os.path.join(workspace, rel))
+    timings["tables"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _train_plantation_model(workspace)
+    timings["plantation_model"] = time.perf_counter() - start
+
+    manifest = {
+        "params": params,
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "pollution_csv_bytes": os.path.getsize(os.path.join(workspace, POLLUTION_FILE)),
+        "seconds": {k: round(v, 3) for k, v in timings.items()},
+    }
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=1)
+    print(f"🧪 Synthetic workspace ready at {workspace}: {cities:,} cities, {pollution_rows:,} pollution rows, "
+          f"{soil_rows:,} soil rows ({sum(timings.values()):.1f}s)")
+    return manifest
+
+
+def reset_workspace(workspace, manifest):
+    """Drop stores, caches and reports from earlier runs and cut the pollution CSV back to its generated size."""
+    for rel in RUN_STATE:
+        path = os.path.join(workspace, rel)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+    os.truncate(os.path.join(workspace, POLLUTION_FILE), manifest["pollution_csv_bytes"])
@@ -0,0 +1,190 @@
+# common/datasets.py
+#Purpose: Loads each reference table once per process, normalizes it once and keys it by city/state.
+
+import json
+import os
+import threading
+
+import pandas as pd
+
+from common import metrics
+from common.names import NameIndex
+
+HEALTH_FILE = "section2_Bioknowledge/data/health_dataset_expanded.csv"
+STATEWISE_LE_FILE = "section3_LE/data/state_life_expectancy_2017_21_india.csv"
+HEALTH_RANGES_FILE = "section2_Bioknowledge/utils/health_ranges.json"
+SOIL_FILE = "section4_SoilFertility/data/soil_fertility.csv"
+
+_lock = threading.RLock()
+_tables = {}        # name -> (path, mtime_ns, value)
+
+
+def _cached(name, path, loader):
+    """Return loader(path), reusing the previous result until the file's mtime changes."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"❌ Dataset not found at {path}")
+    mtime = os.stat(path).st_mtime_ns
+    with _lock:
+        entry = _tables.get(name)
+        if entry and entry[0] == path and entry[1] == mtime:
+            metrics.cache_lookup("datasets", True, table=name)
+            return entry[2]
+        metrics.cache_lookup("datasets", False, table=name)
+        with metrics.timer("dataset_load_seconds", table=name):
+            value = loader(path)
+        _tables[name] = (path, mtime, value)
+        return value
+
+
+def load_vocabulary():
+    """Build every table's name index so fuzzy matching knows all real place names."""
+    for loader in (health_table, state_le_table, soil_table):
+        try:
+            loader()
+        except (FileNotFoundError, KeyError):
+            pass
+
+
+def _match(name, index, fuzzy=True):
+    """index.match(), with fuzzy matching only after all names are known (a real place is never "corrected")."""
+    key, how = index.match(name, fuzzy=False)
+    if key is None and fuzzy:
+        load_vocabulary()
+        key, how = index.match(name)
+    return key, how
+
+
+def clear():
+    """Drop every cached table (next access reloads from disk)."""
+    with _lock:
+        _tables.clear()
+
+
+# ==========================================================
+# 🔹 Health dataset (section 2 / section 3)
+# ==========================================================
+def _load_health(path):
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.strip().str.lower()
+    df["city"] = df["city"].astype(str).str.strip().str.lower()
+    df["state"] = df["state"].astype(str).str.strip()
+    by_city = {city: group for city, group in df.groupby("city", sort=False)}
+    return df, by_city, NameIndex(by_city)
+
+
+def health_table(path=HEALTH_FILE):
+    """Whole health dataset with lower-case columns and normalized city names (shared, do not mutate)."""
+    return _cached("health", path, _load_health)[0]
+
+
+def resolve_city(city, path=HEALTH_FILE):
+    """(dataset city key, how) for a free-form city name — how is exact / alias / fuzzy — or (None, None)."""
+    return _match(city, _cached("health", path, _load_health)[2])
+
+
+def health_records(city, path=HEALTH_FILE):
+    """Rows for one city as a fresh DataFrame, or None."""
+    _, by_city, index = _cached("health", path, _load_health)
+    group = by_city.get(_match(city, index)[0])
+    return None if group is None else group.copy()
+
+
+def state_for_city(city, path=HEALTH_FILE):
+    _, by_city, index = _cached("health", path, _load_health)
+    group = by_city.get(_match(city, index)[0])
+    return None if group is None else group.iloc[0]["state"]
+
+
+# ==========================================================
+# 🔹 State-wise life expectancy (section 3)
+# ==========================================================
+def _load_state_le(path):
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.strip().str.lower()
+
+    if "state" not in df.columns:
+        raise KeyError("❌ 'state' column not found in life expectancy dataset. Please check your CSV headers.")
+
+    df["state"] = df["state"].astype(str).str.strip().str.lower()
+    df = df.drop_duplicates("state", keep="first")
+
+    # Choose which column to use — 'Total' if available, else average of Male/Female
+    if "total" in df.columns:
+        base = df["total"].astype(float)
+    elif "total_male" in df.columns and "total_female" in df.columns:
+        base = (df["total_male"] + df["total_female"]) / 2
+    else:
+        raise KeyError("⚠️ No valid life expectancy value column found (Expected 'Total' or gender-based columns).")
+
+    by_state = dict(zip(df["state"], base.astype(float)))
+    return df, by_state, NameIndex(by_state)
+
+
+def state_le_table(path=STATEWISE_LE_FILE):
+    return _cached("state_le", path, _load_state_le)[0]
+
+
+def resolve_state(state, path=STATEWISE_LE_FILE):
+    """(LE table state key, how) or (None, None); 'Jammu and Kashmir' finds 'jammu & kashmir'."""
+    return _match(state, _cached("state_le", path, _load_state_le)[2])
+
+
+def base_life_expectancy(state, path=STATEWISE_LE_FILE):
+    """Base LE (years) for a state, or None."""
+    _, by_state, index = _cached("state_le", path, _load_state_le)
+    return by_state.get(_match(state, index)[0])
+
+
+def base_life_expectancy_map(path=STATEWISE_LE_FILE):
+    """{normalized state: base LE} for vectorized joins (shared, do not mutate)."""
+    return _cached("state_le", path, _load_state_le)[1]
+
+
+# ==========================================================
+# 🔹 Healthy reference ranges (section 2)
+# ==========================================================
+def _load_json(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def health_ranges(path=HEALTH_RANGES_FILE):
+    return _cached("health_ranges", path, _load_json)
+
+
+# ==========================================================
+# 🔹 Soil nutrient table (section 4)
+# ==========================================================
+def _load_soil(path):
+    df = pd.read_csv(path)
+    df.columns = [c.strip().lower().replace(" ", "") for c in df.columns]  # "Zn %" → "zn%"
+    if "district" not in df.columns:
+        raise KeyError("⚠️ 'District' column not found. Please verify CSV headers.")
+    df["district"] = df["district"].astype(str).str.strip()
+    keys = df["district"].str.lower()
+    by_district = {k: idx.to_numpy() for k, idx in df.groupby(keys, sort=False).groups.items()}
+    return df, by_district, NameIndex(by_district)
+
+
+def soil_table(path=SOIL_FILE):
+    """Soil nutrient table with normalized column names (shared, do not mutate)."""
+    return _cached("soil", path, _load_soil)[0]
+
+
+def soil_records(district, path=SOIL_FILE):
+    """Every row for a district name (several states share names), or None."""
+    df, by_district, index = _cached("soil", path, _load_soil)
+    idx = by_district.get(_match(district, index)[0])
+    return None if idx is None else df.loc[idx].copy()
+
+
+def resolve_district(district, path=SOIL_FILE):
+    """(soil table district key, how) or (None, None)."""
+    return _match(district, _cached("soil", path, _load_soil)[2])
+
+
+def suggest(kind, name, n=3):
+    """'Did you mean' candidates from the city, state or district index."""
+    loaders = {"city": ("health", HEALTH_FILE, _load_health), "state": ("state_le", STATEWISE_LE_FILE, _load_state_le),
+               "district": ("soil", SOIL_FILE, _load_soil)}
+    return _cached(*loaders[kind])[2].suggest(name, n)
@@ -0,0 +1,232 @@
+# common/metrics.py
+#Purpose: In-process counters, timers and histograms for the hot paths, with Prometheus-text / JSON export and per-request traces.
+
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+PREFIX = "envint_"
+
+# Seconds; covers cache hits (sub-ms) up to slow API calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RESERVOIR_SIZE = 1024       # recent samples kept per histogram for p50 / p95
+
+# ENVINT_METRICS_FILE=metrics.json (or .prom) writes a snapshot when the process exits
+METRICS_FILE = os.environ.get("ENVINT_METRICS_FILE")
+ENABLED = os.environ.get("ENVINT_METRICS", "1") != "0"
+
+_lock = threading.Lock()
+_counters = {}      # (name, labels) -> float
+_histograms = {}    # (name, labels) -> _Histogram
+_trace = contextvars.ContextVar("envint_trace", default=None)
+
+
+def _labels(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+        for i, edge in enumerate(self.buckets):
+            if value <= edge:
+                self.counts[i] += 1
+                break
+
+    def quantile(self, q):
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# ==========================================================
+# 🔹 Recording
+# ==========================================================
+def inc(name, value=1, **labels):
+    """Add value to a counter."""
+    if not ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    """Record one histogram sample (seconds for timers)."""
+    if not ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = _Histogram()
+        hist.observe(value)
+
+
+def cache_lookup(cache, found, **labels):
+    """Count a cache lookup as hit or miss."""
+    inc("cache_requests_total", cache=cache, result="hit" if found else "miss", **labels)
+
+
+@contextmanager
+def timer(name, **labels):
+    """Time the block into histogram `name`; also appended to the current trace, if any."""
+    trace = _trace.get()
+    start = time.perf_counter()
+    if trace is not None:
+        trace["depth"] += 1
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        observe(name, elapsed, **labels)
+        if trace is not None:
+            trace["depth"] -= 1
+            trace["spans"].append({
+                "name": name,
+                "labels": dict(labels),
+                "start_ms": round((start - trace["started"]) * 1000, 3),
+                "ms": round(elapsed * 1000, 3),
+                "depth": trace["depth"],
+            })
+
+
+def timed(name, **labels):
+    """Decorator form of timer()."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ==========================================================
+# 🔹 Per-request traces
+# ==========================================================
+@contextmanager
+def trace(name="request"):
+    """
+    Collect every timer() span in this context (thread / task) into a trace dict:
+    {"name", "ms", "spans": [{name, labels, start_ms, ms, depth}, ...]}.
+    """
+    record = {"name": name, "started": time.perf_counter(), "depth": 0, "spans": []}
+    token = _trace.set(record)
+    try:
+        yield record
+    finally:
+        _trace.reset(token)
+        record["ms"] = round((time.perf_counter() - record.pop("started")) * 1000, 3)
+        record.pop("depth", None)
+        record["spans"].sort(key=lambda s: s["start_ms"])
+
+
+def current_trace():
+    return _trace.get()
+
+
+# ==========================================================
+# 🔹 Export
+# ==========================================================
+def snapshot():
+    """Every counter and histogram as plain JSON-able dicts."""
+    with _lock:
+        counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(_counters.items())]
+        histograms = []
+        for (n, l), h in sorted(_histograms.items(), key=lambda kv: kv[0]):
+            histograms.append({
+                "name": n,
+                "labels": dict(l),
+                "count": h.count,
+                "sum": round(h.sum, 6),
+                "mean": round(h.sum / h.count, 6) if h.count else None,
+                "p50": h.quantile(0.5),
+                "p95": h.quantile(0.95),
+                "max": max(h.recent) if h.recent else None,
+            })
+    return {"counters": counters, "histograms": histograms}
+
+
+def quantile(name, q, **labels):
+    """Recent-sample quantile of one histogram, or None."""
+    with _lock:
+        hist = _histograms.get((name, _labels(labels)))
+        return hist.quantile(q) if hist else None
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def to_prometheus():
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    with _lock:
+        seen = set()
+        for (name, labels), value in sorted(_counters.items()):
+            metric = PREFIX + name
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            lines.append(f"{metric}{_fmt_labels(labels)} {value:g}")
+
+        for (name, labels), hist in sorted(_histograms.items(), key=lambda kv: kv[0]):
+            metric = PREFIX + name
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} histogram")
+                seen.add(metric)
+            cumulative = 0
+            for edge, count in zip(hist.buckets, hist.counts):
+                cumulative += count
+                lines.append(f"{metric}_bucket{_fmt_labels(labels, [('le', f'{edge:g}')])} {cumulative}")
+            lines.append(f"{metric}_bucket{_fmt_labels(labels, [('le', '+Inf')])} {hist.count}")
+            lines.append(f"{metric}_sum{_fmt_labels(labels)} {hist.sum:.6f}")
+            lines.append(f"{metric}_count{_fmt_labels(labels)} {hist.count}")
+    return "\n".join(lines) + "\n"
+
+
+def to_json():
+    return json.dumps(snapshot(), indent=1)
+
+
+def write(path):
+    """Write a snapshot; '.prom' / '.txt' get Prometheus text, anything else JSON."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    text = to_prometheus() if path.endswith((".prom", ".txt")) else to_json()
+    with open(path, "w") as f:
+        f.write(text)
+    return path
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+if METRICS_FILE:
+    atexit.register(write, METRICS_FILE)
@@ -0,0 +1,147 @@
+# common/model_registry.py
+#Purpose: Loads each trained model artifact once, reloads it when the file changes and records load cost.
+
+import os
+import threading
+import time
+
+from common import metrics
+
+MODEL_PATHS = {
+    "plantation": "section1Pollution/section1-Pollution/models/plantation_model.pkl",
+    "soil_fertility": "section4_SoilFertility/models/soil_fertility_model.pkl",
+    "soil_scaler": "section4_SoilFertility/models/scaler.pkl",
+}
+
+_lock = threading.RLock()
+_models = {}        # path -> {"model", "mtime", "stats"}
+
+
+def _resolve(name_or_path):
+    return MODEL_PATHS.get(name_or_path, name_or_path)
+
+
+def _rss_bytes():
+    """Resident set size of this process (Linux /proc), or None where unavailable."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _load(path):
+    """
+    joblib.load with wall time and memory measured. Memory is the RSS growth
+    across the load, so the first model also carries the cost of importing joblib / sklearn.
+    """
+    import joblib
+
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+    with metrics.timer("model_load_seconds", model=os.path.basename(path)):
+        model = joblib.load(path)
+    elapsed = time.perf_counter() - start
+    rss_after = _rss_bytes()
+
+    stats = {
+        "path": path,
+        "load_seconds": round(elapsed, 4),
+        "memory_bytes": max(rss_after - rss_before, 0) if rss_before is not None and rss_after is not None else None,
+        "file_bytes": os.path.getsize(path),
+        "loaded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    return model, stats
+
+
+def get_model(name_or_path):
+    """
+    Return the loaded artifact for a registered name (see MODEL_PATHS) or a path.
+    Loaded lazily on first use and reloaded when the file's mtime changes.
+    """
+    path = _resolve(name_or_path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"❌ Model not found at {path}. Train it first.")
+    mtime = os.stat(path).st_mtime_ns
+
+    with _lock:
+        entry = _models.get(path)
+        if entry and entry["mtime"] == mtime:
+            metrics.cache_lookup("models", True, model=os.path.basename(path))
+            return entry["model"]
+
+        metrics.cache_lookup("models", False, model=os.path.basename(path))
+        model, stats = _load(path)
+        stats["loads"] = (entry["stats"]["loads"] + 1) if entry else 1
+        _models[path] = {"model": model, "mtime": mtime, "stats": stats}
+        return model
+
+
+def get_predictor(name_or_path):
+    """
+    Object with predict() for a forest model: the exported flat arrays
+    (common/tree_export.py) when an export at least as new as the .pkl exists,
+    otherwise the sklearn model itself.
+    """
+    from common.tree_export import flat_path_for, load_forest
+
+    path = _resolve(name_or_path)
+    flat_path = flat_path_for(path)
+    meta_path = os.path.join(flat_path, "meta.json")
+    if not os.path.exists(meta_path) or (
+        os.path.exists(path) and os.stat(meta_path).st_mtime_ns < os.stat(path).st_mtime_ns
+    ):
+        return get_model(path)
+
+    mtime = os.stat(meta_path).st_mtime_ns
+    with _lock:
+        entry = _models.get(flat_path)
+        if entry and entry["mtime"] == mtime:
+            metrics.cache_lookup("models", True, model=os.path.basename(flat_path))
+            return entry["model"]
+
+        metrics.cache_lookup("models", False, model=os.path.basename(flat_path))
+        start = time.perf_counter()
+        with metrics.timer("model_load_seconds", model=os.path.basename(flat_path)):
+            forest = load_forest(flat_path)
+        stats = {
+            "path": flat_path,
+            "load_seconds": round(time.perf_counter() - start, 4),
+            "memory_bytes": 0,      # memory-mapped
+            "file_bytes": sum(os.path.getsize(os.path.join(flat_path, f)) for f in os.listdir(flat_path)),
+            "loaded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "loads": (entry["stats"]["loads"] + 1) if entry else 1,
+        }
+        _models[flat_path] = {"model": forest, "mtime": mtime, "stats": stats}
+        return forest
+
+
+def preload(names=None):
+    """Warm the registry at startup. Missing artifacts are skipped. Returns model_stats()."""
+    for name in names or MODEL_PATHS:
+        try:
+            get_predictor(name)
+        except FileNotFoundError as e:
+            print(f"⚠️ {e}")
+    return model_stats()
+
+
+def model_stats():
+    """Per-model load time, allocated memory and file size for everything loaded so far."""
+    from common.tree_export import flat_path_for
+
+    names = {path: name for name, path in MODEL_PATHS.items()}
+    names.update({flat_path_for(path): f"{name} (flat)" for name, path in MODEL_PATHS.items()})
+    with _lock:
+        return {names.get(path, path): dict(entry["stats"]) for path, entry in _models.items()}
+
+
+def clear():
+    with _lock:
+        _models.clear()
+
+
+if __name__ == "__main__":
+    for name, stats in preload().items():
+        memory = "n/a" if stats["memory_bytes"] is None else f"{stats['memory_bytes'] / 1024:.0f} KB"
+        print(f"📦 {name}: {stats['load_seconds']}s, {memory} in memory ({stats['file_bytes'] / 1024:.0f} KB on disk)")
@@ -0,0 +1,196 @@
+# common/names.py
+#Purpose: One normalization + alias + fuzzy-matching index for city, district and state names across all sections.
+
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+# Renamed / alternate spellings. Whichever member a table actually contains is the one returned.
+ALIAS_GROUPS = [
+    # cities / districts
+    {"gurugram", "gurgaon"},
+    {"mumbai", "bombay"},
+    {"chennai", "madras"},
+    {"kolkata", "calcutta"},
+    {"bengaluru", "bangalore", "bengaluru urban", "bangalore urban"},
+    {"bengaluru rural", "bangalore rural"},
+    {"pune", "poona"},
+    {"vadodara", "baroda"},
+    {"thiruvananthapuram", "trivandrum"},
+    {"kochi", "cochin", "ernakulam"},
+    {"kozhikode", "calicut"},
+    {"mysuru", "mysore"},
+    {"mangaluru", "mangalore", "dakshina kannada"},
+    {"belagavi", "belgaum"},
+    {"hubballi", "hubli", "hubli dharwad"},
+    {"kalaburagi", "gulbarga"},
+    {"prayagraj", "allahabad"},
+    {"varanasi", "benares", "banaras"},
+    {"ayodhya", "faizabad"},
+    {"shimla", "simla"},
+    {"puducherry", "pondicherry"},
+    {"visakhapatnam", "vizag", "vishakhapatnam"},
+    {"guwahati", "gauhati"},
+    {"thoothukudi", "tuticorin"},
+    {"tiruchirappalli", "trichy", "tiruchirapalli"},
+    {"nuh", "mewat"},
+    {"new delhi", "delhi"},
+    # states / union territories
+    {"odisha", "orissa"},
+    {"uttarakhand", "uttaranchal"},
+    {"delhi", "nct of delhi"},
+    {"andaman and nicobar islands", "andaman and nicobar island", "andaman and nicobar"},
+    {"dadra and nagar haveli and daman and diu", "dadra and nagar haveli", "daman and diu"},
+    {"chhattisgarh", "chattisgarh", "chhatisgarh"},
+]
+
+MEMO_SIZE = 4096       # fuzzy results kept per index
+
+_NON_WORD = re.compile(r"[^a-z0-9& ]+")
+_SPACES = re.compile(r"\s+")
+
+# Every name any index holds. A query that is itself a known place is never
+# fuzzy-matched to a different one (Raipur must not become Jaipur).
+_known = set()
+_known_lock = threading.Lock()
+
+
+def normalize(name):
+    """'  South-Delhi ' → 'south delhi', 'Jammu & Kashmir' → 'jammu and kashmir', accents dropped."""
+    if name is None:
+        return ""
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode()
+    text = _NON_WORD.sub(" ", text.lower().replace("_", " ").replace("-", " "))
+    text = text.replace("&", " and ")
+    return _SPACES.sub(" ", text).strip()
+
+
+def _compact(norm):
+    return norm.replace(" ", "")
+
+
+def _trigrams(norm):
+    padded = f"  {norm} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit=None):
+    """Levenshtein distance; stops early and returns limit + 1 once it cannot be within limit."""
+    if a == b:
+        return 0
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if limit is not None and min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+def max_edits(norm):
+    """Typos tolerated for a name of this length."""
+    n = len(norm)
+    return 1 if n <= 5 else 2 if n <= 10 else 3
+
+
+# ==========================================================
+# 🔹 Name index
+# ==========================================================
+class NameIndex:
+    """
+    Resolves free-form names to the keys of one table:
+    exact normalized match → space-insensitive match → alias → fuzzy (trigram
+    candidates ranked by edit distance, only when the best match is unambiguous).
+    Lookups are dict hits; fuzzy results are memoized.
+    """
+
+    def __init__(self, keys, aliases=ALIAS_GROUPS):
+        self.keys = list(dict.fromkeys(keys))
+        self._exact = {}
+        self._compact = {}
+        for key in self.keys:
+            norm = normalize(key)
+            self._exact.setdefault(norm, key)
+            self._compact.setdefault(_compact(norm), key)
+
+        # Alias members resolve to whichever member this table holds
+        self._alias = {}
+        for group in aliases:
+            present = [self._exact[normalize(a)] for a in sorted(group) if normalize(a) in self._exact]
+            if present:
+                for a in group:
+                    self._alias.setdefault(normalize(a), present[0])
+
+        # Fuzzy candidates include alias spellings ("gurugrm" → gurugram → table's "gurgaon")
+        self._targets = {**self._alias, **self._exact}
+        self._norms = list(self._targets)
+        self._postings = {}
+        for i, norm in enumerate(self._norms):
+            for gram in _trigrams(norm):
+                self._postings.setdefault(gram, []).append(i)
+
+        self._memo = {}
+        self._lock = threading.Lock()
+        with _known_lock:
+            _known.update(self._exact)
+            _known.update(normalize(a) for group in aliases for a in group)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, name):
+        return self.resolve(name, fuzzy=False) is not None
+
+    def match(self, name, fuzzy=True):
+        """(key, how) with how in exact / alias / fuzzy, or (None, None)."""
+        norm = normalize(name)
+        if not norm:
+            return None, None
+        if norm in self._exact:
+            return self._exact[norm], "exact"
+        if _compact(norm) in self._compact:
+            return self._compact[_compact(norm)], "exact"
+        if norm in self._alias:
+            return self._alias[norm], "alias"
+        if not fuzzy or norm in _known:
+            return None, None
+
+        with self._lock:
+            if norm not in self._memo:
+                if len(self._memo) >= MEMO_SIZE:
+                    self._memo.clear()
+                best = self._closest(norm, 2)
+                # Only accept a single clear winner (two spellings of the same key are not a tie)
+                if best and (len(best) == 1 or best[0][0] < best[1][0]
+                             or self._targets[best[0][1]] == self._targets[best[1][1]]):
+                    self._memo[norm] = self._targets[best[0][1]]
+                else:
+                    self._memo[norm] = None
+            key = self._memo[norm]
+        return (key, "fuzzy") if key is not None else (None, None)
+
+    def resolve(self, name, fuzzy=True):
+        """Table key for a name, or None."""
+        return self.match(name, fuzzy)[0]
+
+    def _closest(self, norm, n, limit=None, candidates=20):
+        """Up to n (distance, normalized name) pairs within the edit limit, best first."""
+        limit = max_edits(norm) if limit is None else limit
+        shared = Counter(i for gram in _trigrams(norm) for i in self._postings.get(gram, ()))
+        scored = []
+        for i, _ in shared.most_common(candidates):
+            dist = edit_distance(norm, self._norms[i], limit)
+            if dist <= limit:
+                scored.append((dist, self._norms[i]))
+        return sorted(scored)[:n]
+
+    def suggest(self, name, n=3):
+        """Closest table keys for a 'did you mean' hint (looser than match)."""
+        norm = normalize(name)
+        keys = [self._targets[m] for _, m in self._closest(norm, n * 2, limit=max_edits(norm) + 2)]
+        return list(dict.fromkeys(keys))[:n]
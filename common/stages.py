@@ -0,0 +1,135 @@
+# common/stages.py
+#Purpose: Small dependency-aware stage scheduler — independent stages run concurrently, output stays in order.
+
+import contextvars
+import io
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class Stage:
+    """
+    A named unit of work. deps lists stage names that must finish first.
+    main_thread=True runs it on the calling thread (e.g. GUI work such as plt.show()).
+    """
+
+    def __init__(self, name, func, deps=(), main_thread=False):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.main_thread = main_thread
+
+
+class _StageOutput(io.TextIOBase):
+    """
+    sys.stdout proxy: each stage writes into its own buffer, everything else passes through.
+    The buffer lives in a context variable, so threads a stage starts with its context
+    (contextvars.copy_context().run, as the hedged provider calls do) write there too.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.buffer = contextvars.ContextVar("stage_output", default=None)
+
+    def write(self, s):
+        buf = self.buffer.get()
+        (buf if buf is not None else self.target).write(s)
+        return len(s)
+
+    def flush(self):
+        self.target.flush()
+
+
+def run_stages(stages, max_workers=None, report=True):
+    """
+    Run stages respecting deps. Output of each stage is printed in declaration
+    order as soon as it and every earlier stage are done. A stage whose
+    dependency failed is skipped. Returns (results, timings) keyed by stage name.
+    """
+    by_name = {s.name: s for s in stages}
+    for s in stages:
+        missing = [d for d in s.deps if d not in by_name]
+        if missing:
+            raise ValueError(f"❌ Stage '{s.name}' depends on unknown stage(s): {missing}")
+
+    results, errors, timings, outputs = {}, {}, {}, {}
+    done, started = set(), set()
+    flushed = 0
+    proxy = _StageOutput(sys.stdout)
+    real_stdout, sys.stdout = sys.stdout, proxy
+
+    def execute(stage):
+        buffer = io.StringIO()
+        token = proxy.buffer.set(buffer)
+        start = time.perf_counter()
+        try:
+            return stage.func(), None
+        except Exception as e:
+            return None, e
+        finally:
+            timings[stage.name] = time.perf_counter() - start
+            outputs[stage.name] = buffer.getvalue()
+            proxy.buffer.reset(token)
+
+    def finish(stage, result, error):
+        done.add(stage.name)
+        if error is not None:
+            errors[stage.name] = error
+            outputs[stage.name] += f"\n⚠️ Stage '{stage.name}' failed: {error}\n"
+        else:
+            results[stage.name] = result
+
+    def flush_ready():
+        nonlocal flushed
+        while flushed < len(stages) and stages[flushed].name in done:
+            real_stdout.write(outputs.get(stages[flushed].name, ""))
+            flushed += 1
+        real_stdout.flush()
+
+    wall_start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers or max(1, len(stages))) as pool:
+            running = {}
+            while len(done) < len(stages):
+                for stage in stages:
+                    if stage.name in started or not all(d in done for d in stage.deps):
+                        continue
+                    failed = [d for d in stage.deps if d in errors]
+                    if failed:
+                        started.add(stage.name)
+                        timings[stage.name] = 0.0
+                        outputs[stage.name] = ""
+                        finish(stage, None, RuntimeError(f"skipped, dependency {failed} failed"))
+                        continue
+                    if not stage.main_thread:
+                        started.add(stage.name)
+                        running[pool.submit(contextvars.copy_context().run, execute, stage)] = stage
+
+                # Main-thread stages run here once their deps are done
+                for stage in stages:
+                    if stage.main_thread and stage.name not in started and all(d in done for d in stage.deps):
+                        started.add(stage.name)
+                        finish(stage, *execute(stage))
+                        flush_ready()
+
+                if running:
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        finish(running.pop(fut), *fut.result())
+                elif len(done) < len(stages) and not any(
+                        s.name not in started and all(d in done for d in s.deps) for s in stages):
+                    raise ValueError("❌ Stage dependencies contain a cycle.")
+                flush_ready()
+    finally:
+        sys.stdout = real_stdout
+
+    wall = time.perf_counter() - wall_start
+    if report:
+        print("\n⏱️ Stage timings:")
+        for stage in stages:
+            status = "failed" if stage.name in errors else "ok"
+            print(f"   ➤ {stage.name:<24} {timings.get(stage.name, 0):7.2f}s  ({status})")
+        print(f"   ➤ {'total (wall)':<24} {wall:7.2f}s  vs {sum(timings.values()):.2f}s if run sequentially")
+    timings["total"] = wall
+    return results, timings
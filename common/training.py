@@ -0,0 +1,196 @@
+# common/training.py
+#Purpose: Shared training pipeline — cached splits, parallel CV search, warm-start refits, versioned artifacts.
+
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+
+import joblib
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.model_selection import ParameterGrid, cross_val_score, train_test_split
+from sklearn.preprocessing import StandardScaler
+
+DEFAULT_GRID = {
+    "n_estimators": [100, 200, 400],
+    "max_depth": [None, 10, 20],
+}
+
+
+def _data_hash(X, y, test_size, random_state):
+    h = hashlib.sha1()
+    h.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    h.update(pd.util.hash_pandas_object(y, index=False).values.tobytes())
+    h.update(f"{list(X.columns)}|{test_size}|{random_state}".encode())
+    return h.hexdigest()[:16]
+
+
+def cached_split(X, y, cache_dir, test_size=0.2, random_state=42):
+    """train_test_split, reused from cache_dir while the data and split settings are unchanged."""
+    key = _data_hash(X, y, test_size, random_state)
+    path = os.path.join(cache_dir, f"split_{key}.joblib")
+    if os.path.exists(path):
+        return joblib.load(path), True
+
+    split = train_test_split(X, y, test_size=test_size, random_state=random_state)
+    os.makedirs(cache_dir, exist_ok=True)
+    joblib.dump(split, path)
+    return split, False
+
+
+def _cv_candidate(estimator_cls, params, X, y, cv, random_state):
+    model = estimator_cls(random_state=random_state, n_jobs=1, **params)
+    return params, float(cross_val_score(model, X, y, cv=cv, n_jobs=1).mean())
+
+
+def resumable_search(estimator_cls, param_grid, X, y, checkpoint_path, cv=5, n_jobs=-1, random_state=42):
+    """
+    Cross-validated grid search with candidates scored in parallel.
+    Every finished candidate is appended to checkpoint_path, so an interrupted
+    search resumes with only the remaining candidates. Returns (best_params, best_score).
+    """
+    done = {}
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r") as f:
+            for line in f:
+                rec = json.loads(line)
+                done[json.dumps(rec["params"], sort_keys=True)] = rec["score"]
+
+    todo = [p for p in ParameterGrid(param_grid) if json.dumps(p, sort_keys=True) not in done]
+    if done:
+        print(f"↩️ Resuming search: {len(done)} candidates cached, {len(todo)} left")
+
+    if todo:
+        jobs = (delayed(_cv_candidate)(estimator_cls, p, X, y, cv, random_state) for p in todo)
+        with open(checkpoint_path, "a") as f:
+            for params, score in Parallel(n_jobs=n_jobs, return_as="generator_unordered")(jobs):
+                done[json.dumps(params, sort_keys=True)] = score
+                f.write(json.dumps({"params": params, "score": score}) + "\n")
+                f.flush()
+
+    best = max(done.items(), key=lambda kv: kv[1])
+    return json.loads(best[0]), best[1]
+
+
+def _next_version(versions_dir, stem):
+    found = [int(m.group(1)) for f in glob.glob(os.path.join(versions_dir, f"{stem}_v*.pkl"))
+             if (m := re.search(r"_v(\d+)\.pkl$", f))]
+    return max(found, default=0) + 1
+
+
+def _publish(obj, canonical_path, versions_dir, version):
+    """Write obj as <stem>_v<N>.pkl and atomically replace the canonical artifact with it."""
+    stem = os.path.splitext(os.path.basename(canonical_path))[0]
+    versioned = os.path.join(versions_dir, f"{stem}_v{version}.pkl")
+    joblib.dump(obj, versioned)
+    tmp = canonical_path + ".tmp"
+    shutil.copyfile(versioned, tmp)
+    os.replace(tmp, canonical_path)
+    return versioned
+
+
+def run_training(name, X, y, estimator_cls, model_path, scaler_path=None, n_estimators=100, search=False,
+                 param_grid=None, incremental=False, extra_trees=50, cv=5, n_jobs=-1, test_size=0.2,
+                 random_state=42):
+    """
+    Train (or warm-start refit) a forest and publish a new artifact version.
+
+    search=True      parallel GridSearchCV over n_estimators / max_depth (param_grid overrides)
+    incremental=True load the current model and grow extra_trees new trees on the current data
+    Returns the run report (also appended to <models dir>/training_runs.jsonl).
+    """
+    timings = {}
+    models_dir = os.path.dirname(model_path) or "."
+    versions_dir = os.path.join(models_dir, "versions")
+    os.makedirs(versions_dir, exist_ok=True)
+
+    # --- 1️⃣ Split (cached) ---
+    start = time.perf_counter()
+    (X_train, X_test, y_train, y_test), split_cached = cached_split(
+        X, y, os.path.join(models_dir, ".cache"), test_size, random_state)
+    timings["split"] = time.perf_counter() - start
+
+    # --- 2️⃣ Optional scaling ---
+    scaler = None
+    if scaler_path:
+        if incremental and os.path.exists(scaler_path):
+            scaler = joblib.load(scaler_path)      # keep the feature space the existing trees were grown in
+        else:
+            scaler = StandardScaler().fit(X_train)
+        X_train_fit, X_test_fit = scaler.transform(X_train), scaler.transform(X_test)
+    else:
+        X_train_fit, X_test_fit = X_train, X_test
+
+    # --- 3️⃣ Fit: warm-start refit, CV search, or a plain multi-core fit ---
+    start = time.perf_counter()
+    best_params, cv_score = None, None
+    if incremental and os.path.exists(model_path):
+        model = joblib.load(model_path)
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + extra_trees, n_jobs=n_jobs)
+        model.fit(X_train_fit, y_train)
+        mode = "incremental"
+    elif search:
+        grid = param_grid or DEFAULT_GRID
+        grid_key = hashlib.sha1(json.dumps(grid, sort_keys=True, default=str).encode()).hexdigest()[:8]
+        data_key = _data_hash(X, y, test_size, random_state)
+        checkpoint = os.path.join(models_dir, ".cache", f"search_{name}_{data_key}_{grid_key}.jsonl")
+        best_params, cv_score = resumable_search(
+            estimator_cls, grid, X_train_fit, y_train, checkpoint, cv=cv, n_jobs=n_jobs, random_state=random_state)
+        model = estimator_cls(random_state=random_state, n_jobs=n_jobs, **best_params)
+        model.fit(X_train_fit, y_train)
+        mode = "search"
+    else:
+        model = estimator_cls(n_estimators=n_estimators, random_state=random_state, n_jobs=n_jobs)
+        model.fit(X_train_fit, y_train)
+        mode = "fit"
+    timings["fit"] = time.perf_counter() - start
+
+    # --- 4️⃣ Evaluate ---
+    start = time.perf_counter()
+    test_score = float(model.score(X_test_fit, y_test))
+    timings["evaluate"] = time.perf_counter() - start
+
+    # Predictions should not keep a worker pool around; restore single-job inference
+    model.set_params(n_jobs=None, warm_start=False)
+
+    # --- 5️⃣ Versioned artifacts ---
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    version = _next_version(versions_dir, stem)
+    artifacts = {"model": _publish(model, model_path, versions_dir, version)}
+    if scaler is not None:
+        artifacts["scaler"] = _publish(scaler, scaler_path, versions_dir, version)
+
+    report = {
+        "name": name,
+        "version": version,
+        "mode": mode,
+        "finished_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "rows": int(len(X)),
+        "split_cached": split_cached,
+        "n_estimators": int(model.n_estimators),
+        "max_depth": model.max_depth,
+        "best_params": best_params,
+        "cv_score": cv_score,
+        "test_score": test_score,
+        "metric": "accuracy" if hasattr(model, "classes_") else "r2",
+        "seconds": {k: round(v, 3) for k, v in timings.items()},
+        "artifacts": artifacts,
+    }
+    with open(os.path.join(models_dir, "training_runs.jsonl"), "a") as f:
+        f.write(json.dumps(report) + "\n")
+
+    print(f"✅ {name} v{version} ({mode}) | {report['metric']}: {test_score:.3f} | "
+          f"fit {timings['fit']:.1f}s | saved at {model_path}")
+    return report
+
+
+def add_cli_args(parser):
+    parser.add_argument("--search", action="store_true", help="parallel CV search over n_estimators/max_depth")
+    parser.add_argument("--incremental", action="store_true", help="warm-start refit of the current model")
+    parser.add_argument("--extra-trees", type=int, default=50, help="trees added by --incremental")
+    parser.add_argument("--jobs", type=int, default=-1, help="CPU cores to use (-1 = all)")
+    return parser
@@ -0,0 +1,181 @@
+# common/tree_export.py
+#Purpose: Flattens fitted sklearn forests into contiguous NumPy arrays and predicts from them without sklearn.
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Arrays written per exported forest (one .npy each so they can be memory-mapped)
+ARRAYS = ["roots", "feature", "threshold", "left", "right", "missing_left", "value"]
+
+
+def flat_path_for(model_path):
+    """plantation_model.pkl → plantation_model.forest (directory)."""
+    return os.path.splitext(model_path)[0] + ".forest"
+
+
+# ==========================================================
+# 🔹 Export
+# ==========================================================
+def export_forest(model, out_dir):
+    """
+    Write a fitted RandomForestClassifier/Regressor (or single decision tree) as
+    concatenated node arrays + meta.json. Child indices are global across trees.
+    """
+    estimators = getattr(model, "estimators_", [model])
+    is_classifier = hasattr(model, "classes_")
+
+    roots, feature, threshold, left, right, missing_left, value = [], [], [], [], [], [], []
+    offset = 0
+    for est in estimators:
+        t = est.tree_
+        n = t.node_count
+        leaf = t.children_left == -1
+        roots.append(offset)
+        feature.append(np.where(leaf, 0, t.feature))
+        threshold.append(t.threshold)
+        left.append(np.where(leaf, -1, t.children_left + offset))
+        right.append(np.where(leaf, -1, t.children_right + offset))
+        # Older sklearn has no missing-value support: NaN <= threshold is False → right
+        missing_left.append(getattr(t, "missing_go_to_left", np.zeros(n, dtype=np.uint8)))
+
+        if is_classifier:
+            v = t.value[:, 0, :].astype(np.float64)
+            totals = v.sum(axis=1, keepdims=True)
+            v = np.divide(v, totals, out=np.zeros_like(v), where=totals > 0)
+        else:
+            v = t.value[:, 0, 0:1].astype(np.float64)
+        value.append(v)
+        offset += n
+
+    arrays = {
+        "roots": np.asarray(roots, dtype=np.int64),
+        "feature": np.concatenate(feature).astype(np.int64),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "left": np.concatenate(left).astype(np.int64),
+        "right": np.concatenate(right).astype(np.int64),
+        "missing_left": np.concatenate(missing_left).astype(bool),
+        "value": np.ascontiguousarray(np.concatenate(value)),
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name, arr in arrays.items():
+        np.save(os.path.join(out_dir, f"{name}.npy"), arr)
+
+    meta = {
+        "kind": "classifier" if is_classifier else "regressor",
+        "classes": np.asarray(model.classes_).tolist() if is_classifier else None,
+        "n_features": int(model.n_features_in_),
+        "feature_names": [str(f) for f in getattr(model, "feature_names_in_", [])] or None,
+        "n_trees": len(estimators),
+        "max_depth": int(max(est.tree_.max_depth for est in estimators)),
+        "n_nodes": int(offset),
+        "source": f"{type(model).__module__}.{type(model).__name__}",
+        "exported_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    # meta.json is written last: its presence/mtime marks a complete export
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=1)
+    return out_dir
+
+
+# ==========================================================
+# 🔹 Lightweight inference engine
+# ==========================================================
+class FlatForest:
+    """
+    Drop-in predict()/predict_proba() over exported arrays. Arrays are memory-mapped,
+    so loading is a few ms and costs no heap until nodes are touched.
+    """
+
+    def __init__(self, path, mmap=True):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+        mode = "r" if mmap else None
+        for name in ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode))
+        self.classes_ = np.asarray(self.meta["classes"]) if self.meta["classes"] is not None else None
+        self.feature_names_in_ = self.meta["feature_names"]
+        self.n_features_in_ = self.meta["n_features"]
+
+    def _as_matrix(self, X):
+        if hasattr(X, "columns") and self.feature_names_in_:
+            X = X[self.feature_names_in_]
+        X = np.asarray(X, dtype=np.float32)     # sklearn trees compare in float32
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return X
+
+    def _leaves(self, X):
+        """Leaf node index per (tree, sample): every tree walks every sample in lockstep."""
+        n = X.shape[0]
+        node = np.repeat(self.roots[:, None], n, axis=1)
+        cols = np.broadcast_to(np.arange(n), node.shape)
+        for _ in range(self.meta["max_depth"]):
+            lft = self.left[node]
+            active = lft != -1
+            if not active.any():
+                break
+            x = X[cols, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.missing_left[node], x <= self.threshold[node])
+            node = np.where(active, np.where(go_left, lft, self.right[node]), node)
+        return node
+
+    def _mean_value(self, X):
+        X = self._as_matrix(X)
+        return self.value[self._leaves(X)].mean(axis=0)     # (n_samples, n_outputs)
+
+    def predict_proba(self, X):
+        if self.meta["kind"] != "classifier":
+            raise AttributeError("predict_proba is only available for exported classifiers.")
+        return self._mean_value(X)
+
+    def predict(self, X):
+        mean = self._mean_value(X)
+        if self.meta["kind"] == "classifier":
+            return self.classes_[np.argmax(mean, axis=1)]
+        return mean[:, 0]
+
+
+def load_forest(path, mmap=True):
+    return FlatForest(path, mmap=mmap)
+
+
+def check_parity(model, forest, X):
+    """True when the flat engine reproduces sklearn's predictions on X."""
+    expected = model.predict(X)
+    got = forest.predict(X)
+    if forest.meta["kind"] == "classifier":
+        return bool(np.array_equal(expected, got))
+    return bool(np.allclose(expected, got, rtol=1e-9, atol=1e-9))
+
+
+if __name__ == "__main__":
+    # Export every registered forest next to its .pkl and verify against sklearn
+    import joblib
+    from common.model_registry import MODEL_PATHS
+
+    rng = np.random.default_rng(0)
+    for name in sys.argv[1:] or ["plantation", "soil_fertility"]:
+        path = MODEL_PATHS.get(name, name)
+        if not os.path.exists(path):
+            print(f"⚠️ {path} not found — skipping {name}.")
+            continue
+        model = joblib.load(path)
+        out = export_forest(model, flat_path_for(path))
+
+        start = time.perf_counter()
+        forest = load_forest(out)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        X = rng.normal(0, 1, (2000, forest.n_features_in_)) * 50 + 50
+        if forest.feature_names_in_:
+            import pandas as pd
+            X = pd.DataFrame(X, columns=forest.feature_names_in_)
+        same = check_parity(model, forest, X)
+        print(f"✅ {name}: {forest.meta['n_trees']} trees, {forest.meta['n_nodes']} nodes → {out} "
+              f"(loads in {load_ms:.1f} ms, matches sklearn: {same})")
@@ -1,75 +1,169 @@
 # main.py-ENV-Int_Project
 
-from section1Pollution.scripts.fetch_pollution import fetch_air_quality
-from section1Pollution.scripts.analyze_pollution import analyze_latest
-from section1Pollution.scripts.suggest_measures import suggest_measures
+import argparse
+
+from common.stages import Stage, run_stages
+
+# Section modules (and the pandas / requests / sklearn stacks behind them) are
+# imported inside each section function, so only the selected sections pay for them.
+SECTIONS = ["pollution", "health", "le", "soil"]
+SECTION_ALIASES = {
+    "1": "pollution", "2": "health", "3": "le", "4": "soil",
+    "bioknowledge": "health", "life_expectancy": "le", "life-expectancy": "le",
+    "soil_fertility": "soil", "soil-fertility": "soil",
+}
+SECTION_MODULES = {
+    "pollution": ["section1Pollution.scripts.fetch_pollution",
+                  "section1Pollution.scripts.analyze_pollution",
+                  "section1Pollution.scripts.suggest_measures"],
+    "health": ["section2_Bioknowledge.scripts2.fetch_bioknowledge",
+               "section2_Bioknowledge.scripts2.analyze_bioknowledge"],
+    "le": ["section3_LE.scripts3.correlate_life_expectancy"],
+    "soil": ["section4_SoilFertility.scripts4.predict_soil_fertility"],
+}
+
+
+def load_section(name):
+    """Import every module a section needs (used by benchmarks/startup.py)."""
+    import importlib
+    return [importlib.import_module(m) for m in SECTION_MODULES[name]]
+
+
+def parse_sections(text):
+    """'1,soil' -> ['pollution', 'soil'] in run order; 'all' / None -> every section."""
+    if not text or text.strip().lower() == "all":
+        return list(SECTIONS)
+    chosen = set()
+    for part in text.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        name = SECTION_ALIASES.get(part, part)
+        if name not in SECTIONS:
+            raise ValueError(f"Unknown section '{part}' (choose from {', '.join(SECTIONS)} or 1-4)")
+        chosen.add(name)
+    return [s for s in SECTIONS if s in chosen]
+
+
+# 🏭 SECTION 1 — Pollution
+def pollution_section(city):
+    from section1Pollution.scripts.fetch_pollution import fetch_air_quality
+    from section1Pollution.scripts.analyze_pollution import analyze_latest
+    from section1Pollution.scripts.suggest_measures import suggest_measures
 
-# --- Section 2 imports ---
-from section2_Bioknowledge.scripts2.fetch_bioknowledge import fetch_bioknowledge
-from section2_Bioknowledge.scripts2.analyze_bioknowledge import analyze_city_health
-
-if __name__ == "__main__":
-    city = input("Enter city name: ").strip()
     print("\n=== Environmental Health Analyzer: Section 1 ===\n")
-
-    # 🏭 SECTION 1 — Pollution
     print("📡 Fetching pollution data...")
-    data = fetch_air_quality(city)
+    try:
+        data = fetch_air_quality(city)
+    except Exception as e:
+        print(f"\n⚠️ Error fetching pollution data: {e}")
+        return None
 
     if not data:
         print(f"\n❌ No pollution data available for '{city}'.")
         print("➡️ Try a nearby major city (e.g., Kanpur, Lucknow, Delhi).")
-    else:
-        print("✅ Latest Data Fetched Successfully:")
-        print(data)
-
-        print("\n📊 Analyzing air quality (AQICN Scale)...")
-        try:
-            analysis = analyze_latest(city)
-            print(f"City: {analysis['city']}")
-            print(f"Time: {analysis['time']}")
-            print(f"AQI: {analysis['aqi']} ({analysis['status']})")
-
-            print("\n💡 Suggested Measures:")
-            for m in suggest_measures(city):
-                print("-", m)
-        except Exception as e:
-            print(f"\n⚠️ Error during analysis: {e}")
-            print("Please check if the CSV has valid and complete data.")
+        return None
 
-# 🧬 SECTION 2 — Bioknowledge
-print("\n=== Environmental Health Analyzer: Section 2 — (Bioknowledge) ===\n")
-
-try:
-    df = fetch_bioknowledge(city)
-    if df is None or df.empty:
-        print(f"⚠️ No bioknowledge data available for '{city}'.")
-        print("➡️ Please add this region in health_dataset.csv under section2_Bioknowledge/data/")
-    else:
-        analyze_city_health(city)
-except Exception as e:
-    print(f"\n⚠️ Error analyzing bioknowledge data: {e}")
+    print("✅ Latest Data Fetched Successfully:")
+    print(data)
 
+    print("\n📊 Analyzing air quality (AQICN Scale)...")
+    try:
+        analysis = analyze_latest(city)
+        print(f"City: {analysis['city']}")
+        print(f"Time: {analysis['time']}")
+        print(f"AQI: {analysis['aqi']} ({analysis['status']})")
 
-# === SECTION 3 — Life Expectancy Analysis ===
-from section3_LE.scripts3.correlate_life_expectancy import correlate_life_expectancy
-
-print("\n=== Environmental Health Analyzer: Section 3 — (Life Expectancy evaluation) ===\n")
-
-try:
-    correlate_life_expectancy(city)
-except Exception as e:
-    print(f"⚠️ Error analyzing life expectancy: {e}")
+        print("\n💡 Suggested Measures:")
+        for m in suggest_measures(city):
+            print("-", m)
+    except Exception as e:
+        print(f"\n⚠️ Error during analysis: {e}")
+        print("Please check if the CSV has valid and complete data.")
+    return data
 
 
+# 🧬 SECTION 2 — Bioknowledge
+def bioknowledge_section(city):
+    from section2_Bioknowledge.scripts2.fetch_bioknowledge import fetch_bioknowledge
+    from section2_Bioknowledge.scripts2.analyze_bioknowledge import analyze_city_health
+
+    print("\n=== Environmental Health Analyzer: Section 2 — (Bioknowledge) ===\n")
+    try:
+        df = fetch_bioknowledge(city)
+        if df is None or df.empty:
+            print(f"⚠️ No bioknowledge data available for '{city}'.")
+            print("➡️ Please add this region in health_dataset.csv under section2_Bioknowledge/data/")
+            return None
+        # The chart window is opened by the main-thread "health chart" stage
+        return analyze_city_health(city, show=False)
+    except Exception as e:
+        print(f"\n⚠️ Error analyzing bioknowledge data: {e}")
 
-# --- Section 4 imports -------------
-from section4_SoilFertility.scripts4.predict_soil_fertility import predict_soil_fertility
 
-print("\n=== Environmental Health Analyzer: Section 4 — (Soil Fertility Prediction) ===\n")
+# === SECTION 3 — Life Expectancy Analysis ===
+def life_expectancy_section(city):
+    from section3_LE.scripts3.correlate_life_expectancy import correlate_life_expectancy
+
+    print("\n=== Environmental Health Analyzer: Section 3 — (Life Expectancy evaluation) ===\n")
+    try:
+        return correlate_life_expectancy(city)
+    except Exception as e:
+        print(f"⚠️ Error analyzing life expectancy: {e}")
+
+
+# === SECTION 4 — Soil Fertility Prediction ===
+def soil_section(city):
+    from section4_SoilFertility.scripts4.predict_soil_fertility import predict_soil_fertility
+
+    print("\n=== Environmental Health Analyzer: Section 4 — (Soil Fertility Prediction) ===\n")
+    try:
+        return predict_soil_fertility(city)
+    except Exception as e:
+        print(f"⚠️ Error analyzing soil fertility: {e}")
+
+
+def chart_section(city):
+    from section2_Bioknowledge.scripts2.analyze_bioknowledge import show_city_chart
+    return show_city_chart(city)
+
+
+def build_stages(city, sections=None, chart=True):
+    """
+    Sections 1, 2 and 4 are independent and run concurrently. Section 3 reads the
+    pollution reading section 1 stores, so it waits for it when both are selected.
+    The chart window needs the main thread and opens as soon as section 2 is done,
+    so a failure elsewhere (e.g. a pollution network error) does not skip it.
+    Output printed by threads a section starts goes into that section's buffer
+    only when they run in its context (see common/stages.py).
+    """
+    sections = SECTIONS if sections is None else sections
+    stages = []
+    if "pollution" in sections:
+        stages.append(Stage("pollution", lambda: pollution_section(city)))
+    if "health" in sections:
+        stages.append(Stage("bioknowledge", lambda: bioknowledge_section(city)))
+    if "le" in sections:
+        deps = ["pollution"] if "pollution" in sections else []
+        stages.append(Stage("life expectancy", lambda: life_expectancy_section(city), deps=deps))
+    if "soil" in sections:
+        stages.append(Stage("soil fertility", lambda: soil_section(city)))
+    if chart and "health" in sections:
+        stages.append(Stage("health chart", lambda: chart_section(city), deps=["bioknowledge"], main_thread=True))
+    return stages
 
-try:
-    predict_soil_fertility(city)
-except Exception as e:
-    print(f"⚠️ Error analyzing soil fertility: {e}")
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Environmental Health Analyzer")
+    parser.add_argument("city", nargs="?", help="city to analyze (asked for when omitted)")
+    parser.add_argument("--sections", default="all",
+                        help="comma list of sections to run: pollution, health, le, soil (or 1-4); default all")
+    parser.add_argument("--no-chart", action="store_true", help="skip the health chart window")
+    args = parser.parse_args()
+    try:
+        sections = parse_sections(args.sections)
+    except ValueError as e:
+        parser.error(str(e))
+
+    city = (args.city or input("Enter city name: ")).strip()
+    run_stages(build_stages(city, sections, chart=not args.no_chart))
@@ -1,5 +1,6 @@
 import pandas as pd
 import os
+from section1Pollution.scripts.pollution_store import get_store, STORE_PATH
 
 FILE_PATH = "section1Pollution/section1-Pollution/data/pollution_data.csv"
 
@@ -14,25 +15,19 @@ def classify_air_quality(aqi):
 
 def analyze_latest(city_name=None):
     """Analyze the most recent record, optionally filtered by city"""
-    if not os.path.exists(FILE_PATH):
+    if not os.path.exists(FILE_PATH) and not os.path.exists(STORE_PATH):
         raise FileNotFoundError(f"❌ {FILE_PATH} not found. Run fetch_pollution first.")
 
-    df = pd.read_csv(FILE_PATH)
-    if df.empty:
-        raise ValueError("❌ pollution_data.csv exists but has no rows. Run fetch_pollution again.")
-
-    required_cols = {"city", "time", "aqi", "co", "no2", "o3", "pm2_5", "pm10", "so2"}
-    if not required_cols.issubset(set(df.columns)):
-        raise ValueError(f"❌ CSV columns mismatch. Expected at least: {sorted(required_cols)}")
-
+    # O(1) lookup in the latest-reading-per-city index
     if city_name:
         city_name = city_name.strip().lower()
-        df_city = df[df["city"].str.lower() == city_name]
-        if df_city.empty:
+        latest = get_store().get_latest(city_name)
+        if latest is None:
             raise ValueError(f"❌ No data found for city '{city_name}'. Fetch data first.")
-        latest = df_city.iloc[-1]
     else:
-        latest = df.iloc[-1]
+        latest = get_store().get_latest()
+        if latest is None:
+            raise ValueError("❌ pollution_data.csv exists but has no rows. Run fetch_pollution again.")
 
     if pd.isna(latest["aqi"]):
         raise ValueError("❌ Latest row has missing 'aqi' value.")
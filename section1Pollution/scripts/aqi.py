@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+# ==========================================================
+# 🔹 US EPA breakpoint tables (the scale AQICN reports on)
+# ==========================================================
+# Concentration edges per pollutant, in the units EPA defines them:
+#   pm2_5 / pm10 µg/m³ (24 h), o3 ppb (8 h, extended with the 1 h table), no2 / so2 ppb (1 h), co ppm (8 h).
+# Adjacent edges are linearly interpolated onto AQI_EDGES.
+AQI_EDGES = np.array([0, 50, 100, 150, 200, 300, 400, 500], dtype=float)
+
+BREAKPOINTS = {
+    "pm2_5": np.array([0, 12.0, 35.4, 55.4, 150.4, 250.4, 350.4, 500.4]),
+    "pm10": np.array([0, 54, 154, 254, 354, 424, 504, 604], dtype=float),
+    "o3": np.array([0, 54, 70, 85, 105, 200, 504, 604], dtype=float),
+    "no2": np.array([0, 53, 100, 360, 649, 1249, 1649, 2049], dtype=float),
+    "so2": np.array([0, 35, 75, 185, 304, 604, 804, 1004], dtype=float),
+    "co": np.array([0, 4.4, 9.4, 12.4, 15.4, 30.4, 40.4, 50.4]),
+}
+
+# µg/m³ → EPA units at 25 °C (ppb = µg/m³ × 24.45 / molar mass; CO additionally /1000 for ppm)
+UGM3_TO_EPA = {
+    "pm2_5": 1.0,
+    "pm10": 1.0,
+    "o3": 24.45 / 48.00,
+    "no2": 24.45 / 46.01,
+    "so2": 24.45 / 64.07,
+    "co": 24.45 / 28.01 / 1000,
+}
+
+POLLUTANTS = list(BREAKPOINTS)
+
+# Same categories as analyze_pollution.classify_air_quality
+STATUS_EDGES = np.array([50, 100, 150, 200, 300], dtype=float)
+STATUS_LABELS = ["Good", "Moderate", "Unhealthy for Sensitive Groups", "Unhealthy", "Very Unhealthy", "Hazardous"]
+
+
+# ==========================================================
+# 🔹 Vectorized sub-index / AQI computation
+# ==========================================================
+def sub_index(concentration, pollutant, units="ugm3"):
+    """AQI sub-index for a whole array of one pollutant. NaN stays NaN, values above the table cap at 500."""
+    c = np.asarray(concentration, dtype=float)
+    if units == "ugm3":
+        c = c * UGM3_TO_EPA[pollutant]
+    edges = BREAKPOINTS[pollutant]
+
+    # segment i covers edges[i] .. edges[i+1]
+    seg = np.clip(np.searchsorted(edges, c, side="right") - 1, 0, len(edges) - 2)
+    c_lo, c_hi = edges[seg], edges[seg + 1]
+    i_lo, i_hi = AQI_EDGES[seg], AQI_EDGES[seg + 1]
+    aqi = i_lo + (i_hi - i_lo) * (c - c_lo) / (c_hi - c_lo)
+
+    aqi = np.clip(aqi, 0, AQI_EDGES[-1])
+    return np.round(aqi)
+
+
+def sub_indices(df, units="ugm3"):
+    """Sub-index column per pollutant present in df (aqi_pm2_5, aqi_pm10, ...)."""
+    return pd.DataFrame(
+        {f"aqi_{p}": sub_index(df[p].to_numpy(dtype=float), p, units) for p in POLLUTANTS if p in df.columns},
+        index=df.index,
+    )
+
+
+def compute_aqi(df, units="ugm3"):
+    """Overall AQI = max sub-index per row (NaN when no pollutant is available)."""
+    subs = sub_indices(df, units)
+    return subs.max(axis=1, skipna=True)
+
+
+def classify_aqi(aqi):
+    """Vectorized classify_air_quality over a whole column."""
+    values = np.asarray(aqi, dtype=float)
+    codes = np.searchsorted(STATUS_EDGES, values, side="left")
+    codes = np.where(np.isnan(values), -1, codes)
+    return pd.Categorical.from_codes(codes, categories=STATUS_LABELS)
+
+
+def recompute_history(df):
+    """
+    Recompute AQI and status for a whole pollution history table in one pass.
+    OWM rows hold raw µg/m³ concentrations and get a breakpoint AQI; AQICN rows
+    already hold per-pollutant sub-indices, so their reported AQI is kept.
+    """
+    out = df.copy()
+    raw = out["source"].astype(str).str.upper().eq("OWM").to_numpy() if "source" in out.columns \
+        else np.ones(len(out), dtype=bool)
+    if raw.any():
+        out.loc[raw, "aqi"] = compute_aqi(out.loc[raw]).to_numpy()
+    out["status"] = classify_aqi(out["aqi"])
+    return out
+
+
+def aqi_from_components(components):
+    """Overall AQI from one OWM components dict (µg/m³), or None if nothing usable."""
+    values = [
+        sub_index([components[p]], p)[0]
+        for p in POLLUTANTS
+        if components.get(p) is not None
+    ]
+    values = [v for v in values if not np.isnan(v)]
+    return int(max(values)) if values else None
+
+
+if __name__ == "__main__":
+    from section1Pollution.scripts.pollution_store import get_store
+    history = recompute_history(get_store().read_frame())
+    print(history[["city", "time", "aqi", "status", "source"]].tail(20).to_string(index=False))
+    print("\n📊 Status counts:")
+    print(history["status"].value_counts().to_string())
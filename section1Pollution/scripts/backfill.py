@@ -0,0 +1,254 @@
+#Purpose: Backfill mode — loads historical pollution for many cities from OWM's history endpoint or bulk CSV / NDJSON dumps.
+
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from common.names import normalize
+from section1Pollution.scripts.aqi import POLLUTANTS, compute_aqi
+from section1Pollution.scripts.collector import PROVIDER_LIMITS, TokenBucket, WATCHLIST_FILE, load_watchlist
+from section1Pollution.scripts.fetch_pollution import OWM_AQI_SCALE, fetch_owm_history, get_session, owm_requests
+from section1Pollution.scripts.pollution_store import COLUMNS, get_store
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+CHUNK_DAYS = 30             # days of hourly history per OWM request (~720 rows)
+BATCH_SIZE = 5000           # rows per store transaction
+FILE_CHUNK_ROWS = 50_000    # rows read at a time from a bulk dump
+COVERED_FRACTION = 0.95     # a chunk with this share of its hours already stored is not fetched again
+DEFAULT_SOURCE = "BULK"     # source for dump rows without their own
+
+
+def _epoch(day):
+    """'YYYY-MM-DD' (local midnight) → unix seconds."""
+    return int(time.mktime(time.strptime(day, "%Y-%m-%d")))
+
+
+def _stamp(epoch):
+    return time.strftime(TIME_FORMAT, time.localtime(epoch))
+
+
+def date_chunks(start, end, days=CHUNK_DAYS):
+    """[start, end) unix seconds split into (chunk_start, chunk_end) windows of at most `days` days."""
+    step = days * 86400
+    return [(t, min(t + step, end)) for t in range(int(start), int(end), step)]
+
+
+# ==========================================================
+# 🔹 Rows → store, in bounded batches
+# ==========================================================
+class BatchWriter:
+    """
+    Buffers rows and writes them BATCH_SIZE at a time with one deduplicating transaction each.
+    Backfilled rows are older than what pollution_data.csv already holds, so they are not
+    appended to it by default (CSV readers expect time order): call export_csv() once done.
+    """
+
+    def __init__(self, store=None, batch_size=BATCH_SIZE, mirror_csv=False):
+        self.store = store or get_store()
+        self.batch_size = batch_size
+        self.mirror_csv = mirror_csv
+        self._buffer = []
+        self.stats = {"rows": 0, "written": 0, "duplicates": 0, "batches": 0}
+
+    def add(self, rows):
+        self._buffer.extend(rows)
+        while len(self._buffer) >= self.batch_size:
+            self._write(self._buffer[:self.batch_size])
+            del self._buffer[:self.batch_size]
+
+    def flush(self):
+        if self._buffer:
+            self._write(self._buffer)
+            self._buffer = []
+        return self.stats
+
+    def _write(self, rows):
+        written = self.store.insert_rows(rows, mirror_csv=self.mirror_csv)
+        self.stats["rows"] += len(rows)
+        self.stats["written"] += len(written)
+        self.stats["duplicates"] += len(rows) - len(written)
+        self.stats["batches"] += 1
+
+    def export_csv(self):
+        """Regenerate the store's CSV mirror, oldest station time first. Returns its path."""
+        return self.store.export_csv(self.store.csv_path)
+
+
+def _with_aqi(df, fallback=None):
+    """Fill missing AQI from the pollutant concentrations (µg/m³, EPA breakpoints), then from fallback."""
+    aqi = df["aqi"] if "aqi" in df.columns else pd.Series(float("nan"), index=df.index)
+    missing = aqi.isna()
+    if missing.any() and any(p in df.columns for p in POLLUTANTS):
+        aqi = aqi.where(~missing, compute_aqi(df.loc[:, [p for p in POLLUTANTS if p in df.columns]]))
+    if fallback is not None:
+        aqi = aqi.fillna(fallback)
+    df["aqi"] = aqi.round()
+    return df
+
+
+# ==========================================================
+# 🔹 OWM history endpoint
+# ==========================================================
+def history_rows(city, entries):
+    """OWM history entries → pollution rows (same rounding and AQI rules as the live OWM fetch)."""
+    if not entries:
+        return []
+    df = pd.DataFrame([e.get("components", {}) for e in entries]).reindex(columns=POLLUTANTS)
+    fallback = pd.Series([OWM_AQI_SCALE.get(e.get("main", {}).get("aqi"), 100) for e in entries], index=df.index)
+    df = _with_aqi(df, fallback)
+    df[POLLUTANTS] = df[POLLUTANTS].fillna(0).round(2)
+    df.insert(0, "time", [_stamp(e["dt"]) for e in entries])
+    df.insert(0, "city", city)
+    df["source"] = "OWM"
+    return df.reindex(columns=COLUMNS).to_dict("records")
+
+
+def backfill_owm(cities, start, end, chunk_days=CHUNK_DAYS, writer=None, bucket=None, force=False):
+    """
+    Fetch hourly OWM history for every city over [start, end) (unix seconds), one
+    chunk_days window per request, and write it through a BatchWriter. Windows that
+    are already (almost) fully stored are skipped, so an interrupted backfill resumes.
+    Returns the writer stats plus requests / skipped / failed chunk counts.
+    """
+    writer = writer or BatchWriter()
+    bucket = bucket or TokenBucket(*PROVIDER_LIMITS["owm"])
+    session = get_session()
+    store = writer.store
+    stats = {"requests": 0, "skipped": 0, "failed": 0}
+    end = min(end, time.time())
+
+    for city in dict.fromkeys(normalize(c) for c in cities if c and c.strip()):
+        city_rows = 0
+        for chunk_start, chunk_end in date_chunks(start, end, chunk_days):
+            hours = (chunk_end - chunk_start) // 3600
+            if not force and hours and \
+                    store.count_between(city, _stamp(chunk_start), _stamp(chunk_end)) >= COVERED_FRACTION * hours:
+                stats["skipped"] += 1
+                continue
+            bucket.acquire(owm_requests(city))      # the first window of a new city also geocodes it
+            stats["requests"] += 1
+            entries = fetch_owm_history(city, chunk_start, chunk_end, session)
+            if entries is None:
+                stats["failed"] += 1
+                print(f"⚠️ {city}: no history for {_stamp(chunk_start)[:10]} → {_stamp(chunk_end)[:10]}")
+                continue
+            rows = history_rows(city, entries)
+            city_rows += len(rows)
+            writer.add(rows)
+        print(f"📥 {city}: {city_rows} hourly readings fetched")
+
+    return {**writer.flush(), **stats}
+
+
+# ==========================================================
+# 🔹 Bulk CSV / NDJSON dumps
+# ==========================================================
+def _read_chunks(path, chunksize):
+    """Stream a .csv / .ndjson / .jsonl dump (optionally .gz) in DataFrame chunks."""
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith((".ndjson", ".jsonl", ".json")):
+        with pd.read_json(path, lines=True, chunksize=chunksize, dtype=False) as reader:
+            yield from reader
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, dtype={"city": str, "time": str})
+
+
+def normalize_chunk(df, source=DEFAULT_SOURCE, cities=None, start=None, end=None):
+    """
+    One dump chunk → rows in store layout. Accepts the pollution_data.csv columns
+    or OWM-shaped records (unix "dt" instead of "time", pollutants under "components").
+    Rows without a usable city / time are dropped; cities and [start, end) filter when given.
+    """
+    if "components" in df.columns:
+        comps = pd.DataFrame(df.pop("components").apply(lambda c: c if isinstance(c, dict) else {}).tolist(),
+                             index=df.index)
+        df = df.join(comps[[p for p in POLLUTANTS if p in comps.columns]])
+    if "time" not in df.columns and "dt" in df.columns:
+        df["time"] = df["dt"].map(lambda t: _stamp(int(t)) if pd.notna(t) else None)
+    if "city" not in df.columns or "time" not in df.columns:
+        raise ValueError("❌ Dump rows need a city and a time (or dt) field.")
+
+    names = {c: normalize(c) for c in df["city"].dropna().unique()}
+    df["city"] = df["city"].map(names)
+    # Format inferred from the first value; only rows that miss it are parsed one by one
+    parsed = pd.to_datetime(df["time"], errors="coerce")
+    retry = parsed.isna() & df["time"].notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(df.loc[retry, "time"], errors="coerce", format="mixed")
+    df["time"] = parsed.dt.strftime(TIME_FORMAT)
+    df = df.dropna(subset=["city", "time"])
+    df = df[df["city"] != ""]
+    if cities:
+        df = df[df["city"].isin(cities)]
+    if start is not None:
+        df = df[df["time"] >= _stamp(start)]
+    if end is not None:
+        df = df[df["time"] < _stamp(end)]
+    if df.empty:
+        return []
+
+    df = _with_aqi(df.copy())
+    df["source"] = df["source"].fillna(source) if "source" in df.columns else source
+    return df.reindex(columns=COLUMNS).to_dict("records")
+
+
+def backfill_files(paths, cities=None, start=None, end=None, source=DEFAULT_SOURCE, writer=None,
+                   chunksize=FILE_CHUNK_ROWS):
+    """Stream every dump through normalize_chunk into the store. Returns the writer stats plus rows read."""
+    writer = writer or BatchWriter()
+    wanted = {normalize(c) for c in cities} if cities else None
+    read = 0
+    for path in paths:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"❌ {path} not found.")
+        file_rows = 0
+        for chunk in _read_chunks(path, chunksize):
+            read += len(chunk)
+            rows = normalize_chunk(chunk, source, wanted, start, end)
+            file_rows += len(rows)
+            writer.add(rows)
+        print(f"📥 {path}: {file_rows} usable rows")
+    return {**writer.flush(), "read": read}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill historical pollution readings into the store")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    owm = sub.add_parser("owm", help="hourly history from the OWM air_pollution/history endpoint")
+    owm.add_argument("cities", nargs="*", help="cities to backfill (default: the watchlist file)")
+    owm.add_argument("--watchlist", default=WATCHLIST_FILE)
+    owm.add_argument("--start", required=True, help="first day, YYYY-MM-DD")
+    owm.add_argument("--end", help="day after the last one, YYYY-MM-DD (default: now)")
+    owm.add_argument("--chunk-days", type=int, default=CHUNK_DAYS)
+    owm.add_argument("--force", action="store_true", help="refetch windows that are already stored")
+
+    dump = sub.add_parser("file", help="bulk .csv / .ndjson dumps (optionally .gz)")
+    dump.add_argument("paths", nargs="+")
+    dump.add_argument("--cities", help="comma-separated cities to keep (default: all)")
+    dump.add_argument("--start", help="first day to keep, YYYY-MM-DD")
+    dump.add_argument("--end", help="day after the last one to keep, YYYY-MM-DD")
+    dump.add_argument("--source", default=DEFAULT_SOURCE, help="source for rows without one")
+
+    for p in (owm, dump):
+        p.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        p.add_argument("--no-export", action="store_true",
+                       help="do not regenerate pollution_data.csv from the store afterwards")
+    args = parser.parse_args()
+
+    writer = BatchWriter(batch_size=args.batch_size)
+    started = time.perf_counter()
+    if args.mode == "owm":
+        cities = args.cities or load_watchlist(args.watchlist)
+        stats = backfill_owm(cities, _epoch(args.start), _epoch(args.end) if args.end else time.time(),
+                             args.chunk_days, writer, force=args.force)
+    else:
+        cities = args.cities.split(",") if args.cities else None
+        stats = backfill_files(args.paths, cities, _epoch(args.start) if args.start else None,
+                               _epoch(args.end) if args.end else None, args.source, writer)
+    print(f"✅ {stats['written']} new rows written, {stats['duplicates']} already stored, "
+          f"{stats['batches']} batches in {time.perf_counter() - started:.1f}s | {stats}")
+    if stats["written"] and not args.no_export:
+        print(f"📄 Regenerated {writer.export_csv()} in time order")
@@ -0,0 +1,232 @@
+#Purpose: Collector mode — polls a watchlist of cities on a schedule and keeps pollution history growing.
+
+import argparse
+import heapq
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from section1Pollution.scripts.fetch_pollution import (
+    DATA_DIR, get_session, fetch_from_aqicn, fetch_from_openweathermap, owm_requests,
+)
+from section1Pollution.scripts.pollution_store import get_store
+from common.names import normalize
+from section1Pollution.scripts.provider_health import breaker, provider_health
+from section1Pollution.scripts import response_cache
+
+WATCHLIST_FILE = os.path.join(DATA_DIR, "watchlist.txt")
+
+POLL_INTERVAL = 3600        # seconds between polls of one city (stations publish hourly)
+MAX_STALE_FACTOR = 4        # unchanged stations are polled up to 4x less often
+BACKOFF_BASE = 30           # first retry after a failed city, in seconds
+BACKOFF_MAX = 3600          # retry delay cap
+MAX_WORKERS = 4
+
+# Requests per second and burst size per provider (AQICN ≈ 1000/min, OWM free tier = 60/min)
+PROVIDER_LIMITS = {
+    "aqicn": (10.0, 20),
+    "owm": (1.0, 5),
+}
+
+
+# ==========================================================
+# 🔹 Token bucket (one per provider, shared by all workers)
+# ==========================================================
+class TokenBucket:
+    """Allows `rate` calls per second on average with bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.granted = 0
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1, stop=None):
+        """Block until `tokens` are available. Returns False if `stop` is set while waiting."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    self.granted += tokens
+                    return True
+                wait = (tokens - self.tokens) / self.rate
+            if stop is not None:
+                if stop.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+def backoff_delay(failures, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2^(failures-1)))."""
+    return random.uniform(0, min(cap, base * 2 ** max(0, failures - 1)))
+
+
+def load_watchlist(path=WATCHLIST_FILE):
+    """One city per line; blank lines and # comments are ignored."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"❌ Watchlist not found at {path}. Add one city per line.")
+    with open(path, "r") as f:
+        cities = [normalize(line.split("#", 1)[0]) for line in f]
+    return list(dict.fromkeys(c for c in cities if c))
+
+
+# ==========================================================
+# 🔹 Collector
+# ==========================================================
+class Collector:
+    """
+    Polls every watched city once per interval (AQICN first, OWM fallback) through
+    per-provider token buckets. Failed cities are retried with exponential backoff
+    and jitter; stations whose timestamp has not moved are not written and are
+    polled progressively less often (up to MAX_STALE_FACTOR × interval).
+    """
+
+    def __init__(self, cities, interval=POLL_INTERVAL, max_workers=MAX_WORKERS, limits=None):
+        self.cities = list(dict.fromkeys(normalize(c) for c in cities if c and c.strip()))
+        self.interval = interval
+        self.max_workers = max_workers
+        self.buckets = {name: TokenBucket(*lim) for name, lim in (limits or PROVIDER_LIMITS).items()}
+        self.stop_event = threading.Event()
+        self.failures = {}          # city -> consecutive failed polls
+        self.stale = {}             # city -> consecutive polls with an unchanged station time
+        self.last_time = {}         # city -> last station time seen or stored
+        self.stats = {"polls": 0, "written": 0, "unchanged": 0, "failed": 0, "calls": {}, "errors": {}}
+
+        store = get_store()
+        for city in self.cities:
+            latest = store.get_latest(city)
+            if latest is not None:
+                self.last_time[city] = str(latest["time"])
+
+        # Everyone is due now, spread over a few seconds so the first round does not burst
+        self._queue = [(time.time() + i * 0.1, city) for i, city in enumerate(self.cities)]
+        heapq.heapify(self._queue)
+
+    def _call(self, provider, fetch, city, session, requests=1):
+        # An open circuit refuses the call anyway; do not spend a token on it
+        if not breaker(provider).available():
+            return None
+        # One token per HTTP call the fetch will make
+        if not self.buckets[provider].acquire(requests, stop=self.stop_event):
+            return None
+        row = fetch(city, session, use_cache=False)
+        if row and response_cache.CACHE_ENABLED:
+            response_cache.get_cache().set(provider, city, row)     # interactive lookups get the fresh reading
+        return row
+
+    def poll(self, city, session=None):
+        """One fresh reading for a city, bypassing the response cache. None if both providers fail."""
+        session = session or get_session()
+        row = self._call("aqicn", fetch_from_aqicn, city, session)
+        if row:
+            return row
+        return self._call("owm", fetch_from_openweathermap, city, session, owm_requests(city))
+
+    def _next_due(self, city, now, outcome):
+        if outcome == "failed":
+            self.failures[city] = self.failures.get(city, 0) + 1
+            return now + backoff_delay(self.failures[city])
+        self.failures.pop(city, None)
+        if outcome == "unchanged":
+            self.stale[city] = min(self.stale.get(city, 0) + 1, MAX_STALE_FACTOR - 1)
+        else:
+            self.stale.pop(city, None)
+        # ±10% jitter keeps cities from re-synchronizing into bursts
+        return now + self.interval * (1 + self.stale.get(city, 0)) * random.uniform(0.9, 1.1)
+
+    def run_round(self, cities, pool):
+        """Poll the due cities concurrently and write only readings with a new station time."""
+        session = get_session()
+        polled = list(zip(cities, pool.map(lambda c: self._safe_poll(c, session), cities)))
+
+        fresh, outcomes = [], {}
+        for city, row in polled:
+            if not row:
+                outcomes[city] = "failed"
+            elif str(row["time"]) == self.last_time.get(city):
+                outcomes[city] = "unchanged"
+            else:
+                fresh.append(row)
+                outcomes[city] = "new"
+
+        written = get_store().insert_rows(fresh) if fresh else []
+        for row in fresh:
+            self.last_time[row["city"]] = str(row["time"])
+
+        counts = {k: list(outcomes.values()).count(k) for k in ("new", "unchanged", "failed")}
+        self.stats["polls"] += len(cities)
+        self.stats["written"] += len(written)
+        self.stats["unchanged"] += counts["unchanged"]
+        self.stats["failed"] += counts["failed"]
+        print(f"🛰️ {time.strftime('%H:%M:%S')} polled {len(cities)} | new {len(written)} | "
+              f"unchanged {counts['unchanged']} | failed {counts['failed']}")
+        return outcomes
+
+    def _safe_poll(self, city, session):
+        try:
+            return self.poll(city, session)
+        except Exception:
+            return None
+
+    def run(self, once=False):
+        """Collect until stop() / Ctrl+C (or after one full round when once=True)."""
+        if not self.cities:
+            print("⚠️ Watchlist is empty — nothing to collect.")
+            return self.stats
+        print(f"📡 Collecting {len(self.cities)} cities every {self.interval}s "
+              f"(limits: {', '.join(f'{k} {b.rate:g}/s' for k, b in self.buckets.items())})")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            try:
+                while not self.stop_event.is_set():
+                    now = time.time()
+                    due = []
+                    while self._queue and (self._queue[0][0] <= now or once):
+                        due.append(heapq.heappop(self._queue)[1])
+
+                    if due:
+                        outcomes = self.run_round(due, pool)
+                        done = time.time()
+                        for city, outcome in outcomes.items():
+                            heapq.heappush(self._queue, (self._next_due(city, done, outcome), city))
+                        if once:
+                            break
+                        continue
+
+                    self.stop_event.wait(max(0.0, self._queue[0][0] - now))
+            except KeyboardInterrupt:
+                print("\n🛑 Collector stopped.")
+        self.stats["calls"] = {name: b.granted for name, b in self.buckets.items()}
+        self.stats["errors"] = {name: h["errors"] for name, h in provider_health().items() if h["errors"]}
+        return self.stats
+
+    def stop(self):
+        self.stop_event.set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Poll a watchlist of cities and append new readings to the store")
+    parser.add_argument("cities", nargs="*", help="cities to watch (default: the watchlist file)")
+    parser.add_argument("--watchlist", default=WATCHLIST_FILE)
+    parser.add_argument("--interval", type=int, default=POLL_INTERVAL, help="seconds between polls per city")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--once", action="store_true", help="poll every city once and exit")
+    args = parser.parse_args()
+
+    cities = args.cities or load_watchlist(args.watchlist)
+    stats = Collector(cities, interval=args.interval, max_workers=args.workers).run(once=args.once)
+    print(f"📊 {stats['polls']} polls, {stats['written']} written, {stats['unchanged']} unchanged, "
+          f"{stats['failed']} failed | API calls: {stats['calls']}")
+    if stats["errors"]:
+        print(f"⚠️ Provider errors by category: {stats['errors']}")
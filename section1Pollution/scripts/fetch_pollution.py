@@ -1,7 +1,19 @@
 import requests
-import pandas as pd
+import contextvars
 import os
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from requests.adapters import HTTPAdapter
+from section1Pollution.scripts.response_cache import cached
+from section1Pollution.scripts.geocode_index import get_index as get_geocode_index
+from section1Pollution.scripts.pollution_store import get_store
+from section1Pollution.scripts.aqi import aqi_from_components
+from section1Pollution.scripts.provider_health import (
+    CIRCUIT_OPEN, ProviderError, UNKNOWN_STATION, aqicn_error, breaker, classify, status_error,
+)
+from common import metrics
+from common.names import normalize
 
 DATA_DIR = "section1Pollution/section1-Pollution/data"
 os.makedirs(DATA_DIR, exist_ok=True)
@@ -10,24 +22,149 @@ FILE_PATH = os.path.join(DATA_DIR, "pollution_data.csv")
 AQICN_KEY = "1cc134e1fd66d2ebe3f9ed6027daf3c3e95fa705"      # replace with your aqicn key
 OWM_KEY = "90b06d1c012d5ac9a9eb54eabab330db"                # replace with your key
 
+# Overridable for local mock servers / proxies (see benchmarks/mock_api.py)
+AQICN_BASE_URL = os.environ.get("AQICN_BASE_URL", "https://api.waqi.info")
+OWM_BASE_URL = os.environ.get("OWM_BASE_URL", "http://api.openweathermap.org")
+
+# Coarse OWM index (1–5) → AQICN-like value, only used when no components are usable
+OWM_AQI_SCALE = {
+    1: 40,     # Good
+    2: 85,     # Fair
+    3: 120,    # Moderate
+    4: 160,    # Poor
+    5: 190     # Very Poor
+}
+
+MAX_WORKERS = 16        # concurrent cities in fetch_air_quality_many
+POOL_SIZE = 32          # keep-alive connections kept per host
+
+
+def _hedge_delay_from_env(default=2.0):
+    value = os.environ.get("ENVINT_HEDGE_DELAY", "").strip().lower()
+    if not value:
+        return default
+    if value in ("off", "none", "sequential"):
+        return None
+    return max(0.0, float(value))
+
+
+# Seconds AQICN gets to answer before OWM is raced against it (0 = start both at once).
+# None (ENVINT_HEDGE_DELAY=off) keeps the sequential AQICN → OWM fallback.
+HEDGE_DELAY = _hedge_delay_from_env()
+HEDGE_WORKERS = 4 * MAX_WORKERS     # provider calls in flight for hedged fetches
+HEDGE_TIMEOUT = 5.0     # per-request timeout of hedged calls: an abandoned loser frees its worker and connection
+
 
 # ==========================================================
-# 🔹 AQICN API
+# 🔹 Shared HTTP session (keep-alive connection pool)
 # ==========================================================
-def fetch_from_aqicn(city):
-    url = f"https://api.waqi.info/feed/{city}/?token={AQICN_KEY}"
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Return the process-wide requests.Session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+_hedge_pool = None
+
+def get_hedge_pool():
+    """Executor running the provider calls of hedged fetches; abandoned calls finish here without blocking callers."""
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _session_lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="hedge")
+    return _hedge_pool
+
+
+def _stopped(stop, provider, endpoint):
+    """True (and counted) when a hedged call was told to give up before its next request."""
+    if stop is not None and stop.is_set():
+        _outcome(provider, endpoint, "cancelled")
+        return True
+    return False
+
+
+def _outcome(provider, endpoint, outcome):
+    metrics.inc("provider_requests_total", provider=provider, endpoint=endpoint, outcome=outcome)
+
+
+def _provider_call(provider, endpoint, request, circuit=None, errors=None):
+    """
+    Run request() (one HTTP call and its parsing) under the provider's circuit breaker
+    (or the one named circuit). Returns its value, or None with the failure counted by
+    category (provider_requests_total{outcome=...} and provider_health()) and, when an
+    errors dict is given, kept there as errors[provider] = ProviderError.
+    """
+    health = breaker(circuit or provider)
+    ticket = health.allow()
+    if ticket is None:
+        _outcome(provider, endpoint, CIRCUIT_OPEN)
+        if errors is not None:
+            errors[provider] = ProviderError(provider, CIRCUIT_OPEN, health.reason or "")
+        return None
+    start = time.perf_counter()
     try:
-        resp = requests.get(url, timeout=15)
-        if resp.status_code != 200:
-            return None
-        data = resp.json()
+        with metrics.timer("provider_request_seconds", provider=provider, endpoint=endpoint):
+            value = request()
+    except Exception as e:
+        error = classify(provider, e)
+        health.record(ticket, time.perf_counter() - start, error)
+        _outcome(provider, endpoint, error.category)
+        if errors is not None:
+            errors[provider] = error
+        return None
+    health.record(ticket, time.perf_counter() - start)
+    _outcome(provider, endpoint, "ok")
+    return value
+
+
+def _get(session, url, provider, timeout):
+    resp = session.get(url, timeout=timeout)
+    if resp.status_code != 200:
+        raise status_error(provider, resp.status_code)
+    return resp.json()
+
+
+# ==========================================================
+# 🔹 AQICN API
+# ==========================================================
+def fetch_from_aqicn(city, session=None, use_cache=True, stop=None, errors=None, timeout=None):
+    """
+    AQICN station reading, served from the response cache when fresh. stop, errors and
+    timeout only apply to this call: a stale entry is refreshed in the background without them.
+    """
+    if use_cache:
+        return cached("aqicn", city, lambda: _request_aqicn(city, session, stop, errors, timeout),
+                      refresh=lambda: _request_aqicn(city, session))
+    return _request_aqicn(city, session, stop, errors, timeout)
+
+
+def _request_aqicn(city, session=None, stop=None, errors=None, timeout=None):
+    if _stopped(stop, "aqicn", "feed"):
+        return None
+    session = session or get_session()
+    url = f"{AQICN_BASE_URL}/feed/{city}/?token={AQICN_KEY}"
+
+    def request():
+        data = _get(session, url, "aqicn", timeout=timeout or 15)
         if data.get("status") != "ok":
-            return None
+            raise aqicn_error(data.get("data"))
 
         iaqi = data["data"].get("iaqi", {})
         def safe_get(p): return iaqi.get(p, {}).get("v", None)
 
-        row = {
+        return {
             "city": city,
             "time": data["data"]["time"]["s"],
             "co": safe_get("co"),
@@ -39,45 +176,78 @@ def fetch_from_aqicn(city):
             "aqi": data["data"].get("aqi"),
             "source": "AQICN"
         }
-        return row
 
-    except Exception:
-        return None
+    return _provider_call("aqicn", "feed", request, errors=errors)
 
 
 # ==========================================================
 # 🔹 OpenWeatherMap API (Fallback)
 # ==========================================================
-def fetch_from_openweathermap(city):
-    try:
-        # --- 1️⃣ Get coordinates ---
-        geo_url = f"http://api.openweathermap.org/geo/1.0/direct?q={city}&limit=1&appid={OWM_KEY}"
-        geo_resp = requests.get(geo_url, timeout=10).json()
+def fetch_from_openweathermap(city, session=None, use_cache=True, stop=None, errors=None, timeout=None):
+    """OWM air-pollution reading, served from the response cache when fresh (stop / errors / timeout as for AQICN)."""
+    if use_cache:
+        return cached("owm", city, lambda: _request_openweathermap(city, session, stop, errors, timeout),
+                      refresh=lambda: _request_openweathermap(city, session))
+    return _request_openweathermap(city, session, stop, errors, timeout)
+
+
+def geocode_city(city, session=None, persist=True, errors=None, timeout=None):
+    """Return (lat, lon) from the local geocode index, calling OWM geo/1.0/direct only on a miss."""
+    index = get_geocode_index()
+    coords = index.get(city)
+    metrics.cache_lookup("geocode", coords is not None)
+    if coords:
+        return coords
+
+    session = session or get_session()
+    geo_url = f"{OWM_BASE_URL}/geo/1.0/direct?q={city}&limit=1&appid={OWM_KEY}"
+
+    def request():
+        geo_resp = _get(session, geo_url, "owm", timeout=timeout or 10)
         if not geo_resp:
-            return None
-        lat, lon = geo_resp[0]["lat"], geo_resp[0]["lon"]
+            raise ProviderError("owm", UNKNOWN_STATION, f"no coordinates for '{city}'")
+        return (geo_resp[0]["lat"], geo_resp[0]["lon"])
+
+    coords = _provider_call("owm", "geo", request, errors=errors)
+    if coords:
+        index.add(city, *coords, persist=persist)
+    return coords
+
+
+def owm_requests(city):
+    """HTTP calls one OWM fetch for city makes: the request itself, plus geo/1.0/direct on an index miss."""
+    return 1 if get_geocode_index().get(city) else 2
+
 
-        # --- 2️⃣ Get air pollution data ---
-        air_url = f"http://api.openweathermap.org/data/2.5/air_pollution?lat={lat}&lon={lon}&appid={OWM_KEY}"
-        air_resp = requests.get(air_url, timeout=10).json()
+def _request_openweathermap(city, session=None, stop=None, errors=None, timeout=None):
+    session = session or get_session()
+
+    # --- 1️⃣ Get coordinates (local index first) ---
+    if _stopped(stop, "owm", "geo"):
+        return None
+    coords = geocode_city(city, session, errors=errors, timeout=timeout)
+    if not coords or _stopped(stop, "owm", "air_pollution"):
+        return None
+    lat, lon = coords
+
+    # --- 2️⃣ Get air pollution data ---
+    air_url = f"{OWM_BASE_URL}/data/2.5/air_pollution?lat={lat}&lon={lon}&appid={OWM_KEY}"
+
+    def request():
+        air_resp = _get(session, air_url, "owm", timeout=timeout or 10)
+        if not air_resp.get("list"):
+            raise ProviderError("owm", UNKNOWN_STATION, f"no readings at {lat}, {lon}")
         air_data = air_resp["list"][0]
         comps = air_data["components"]
         timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(air_data["dt"]))
 
-        # --- 3️⃣ AQI Conversion (Balanced scale) ---
-        # OWM (1–5): 1=Good, 2=Fair, 3=Moderate, 4=Poor, 5=Very Poor
-        # Converted to more balanced AQICN-like scale
-        owm_aqi_scale = {
-            1: 40,     # Good
-            2: 85,     # Fair
-            3: 120,    # Moderate
-            4: 160,    # Poor
-            5: 190     # Very Poor
-        }
-        converted_aqi = owm_aqi_scale.get(air_data["main"]["aqi"], 100)
+        # --- 3️⃣ AQI from raw concentrations (EPA breakpoints, same scale as AQICN) ---
+        converted_aqi = aqi_from_components(comps)
+        if converted_aqi is None:
+            # OWM (1–5): 1=Good, 2=Fair, 3=Moderate, 4=Poor, 5=Very Poor → coarse AQICN-like fallback
+            converted_aqi = OWM_AQI_SCALE.get(air_data["main"]["aqi"], 100)
 
-
-        row = {
+        return {
             "city": city,
             "time": timestamp,
             "co": round(comps.get("co", 0), 2),
@@ -89,44 +259,128 @@ def fetch_from_openweathermap(city):
             "aqi": converted_aqi,
             "source": "OWM"
         }
-        return row
 
-    except Exception:
+    return _provider_call("owm", "air_pollution", request, errors=errors)
+
+
+def fetch_owm_history(city, start, end, session=None):
+    """
+    Raw OWM hourly history entries ({"dt", "main", "components"}) for a city between
+    unix times start (inclusive) and end (exclusive). [] when OWM has no readings, None on failure.
+    """
+    session = session or get_session()
+    coords = geocode_city(city, session)
+    if not coords:
         return None
+    lat, lon = coords
+    url = (f"{OWM_BASE_URL}/data/2.5/air_pollution/history?lat={lat}&lon={lon}"
+           f"&start={int(start)}&end={int(end) - 1}&appid={OWM_KEY}")
+    # Own circuit: slow 30 s history pages must not open the live OWM fallback's breaker
+    return _provider_call("owm", "history", lambda: _get(session, url, "owm", timeout=30).get("list", []),
+                          circuit="owm_history")
 
 
 # ==========================================================
-# 🔹 Save to CSV
+# 🔹 Save (indexed store, mirrored to CSV)
 # ==========================================================
 def save_row(row):
-    df_new = pd.DataFrame([row])
-    if not os.path.exists(FILE_PATH) or os.stat(FILE_PATH).st_size == 0:
-        df_new.to_csv(FILE_PATH, index=False)
-        print(f"✅ New CSV created and record added for {row['city']} at {row['time']}")
-    else:
-        df_existing = pd.read_csv(FILE_PATH)
-        duplicate = ((df_existing["city"] == row["city"]) & (df_existing["time"] == row["time"])).any()
-        if not duplicate:
-            df_new.to_csv(FILE_PATH, mode='a', index=False, header=False)
-            print(f"✅ New record appended for {row['city']} at {row['time']}")
+    if get_store().insert_rows([row]):
+        print(f"✅ New record appended for {row['city']} at {row['time']}")
+
+
+def save_rows(rows):
+    """Append many rows with one indexed dedup pass and one CSV append. Returns rows written."""
+    written = get_store().insert_rows(rows)
+    print(f"✅ {len(written)} new record(s) written to {FILE_PATH}")
+    return written
 
 
 # ==========================================================
 # 🔹 Master Fetch Function (AQICN → OWM)
 # ==========================================================
-def fetch_air_quality(city):
-    city = city.strip().lower()
-    
-    # Try AQICN first
-    row = fetch_from_aqicn(city)
+def _result(future):
+    try:
+        return future.result()
+    except Exception:
+        return None
+
+
+def _submit(pool, fn, *args, **kwargs):
+    """pool.submit in a copy of the caller's context, so metrics traces and stage output follow the call."""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def fetch_row_hedged(city, session=None, delay=None, errors=None):
+    """
+    Start AQICN; if it has not answered within delay seconds, start OWM too and
+    take the first valid reading (AQICN when both are in). The slower call is told
+    to stop before its next request and its result is dropped; hedged requests use
+    HEDGE_TIMEOUT, so a hung station costs the caller at most delay plus the OWM
+    round trip and holds a worker and connection no longer than that timeout.
+    Does not save. Failures of the calls that decided the result land in errors
+    (provider -> ProviderError) when given; an abandoned call writes only its own.
+    """
+    delay = HEDGE_DELAY if delay is None else delay
+    pool = get_hedge_pool()
+    stop = threading.Event()
+    attempts = {}       # future -> that call's own errors
+
+    def start(fetch):
+        own = {}
+        future = _submit(pool, fetch, city, session, stop=stop, errors=own, timeout=HEDGE_TIMEOUT)
+        attempts[future] = own
+        return future
+
+    aqicn = start(fetch_from_aqicn)
+    try:
+        row = aqicn.result(timeout=delay)
+    except FutureTimeout:
+        pass
+    except Exception:
+        row = None
+    else:
+        # AQICN answered in time: its reading, or the usual OWM fallback
+        if errors is not None:
+            errors.update(attempts[aqicn])
+        return row or fetch_from_openweathermap(city, session, errors=errors)
+
+    metrics.inc("provider_hedges_total", provider="owm")
+    owm = start(fetch_from_openweathermap)
+    row = None
+    for fut in as_completed((aqicn, owm)):
+        row = _result(fut)
+        if row:
+            if fut is owm and aqicn.done():
+                row = _result(aqicn) or row
+            metrics.inc("provider_hedge_wins_total", provider=row["source"].lower())
+            break
+    stop.set()
+    if errors is not None:
+        for fut, own in attempts.items():
+            if fut.done():
+                errors.update(own)
+    return row
+
+
+def fetch_row(city, session=None, hedge=True, errors=None):
+    """
+    Fetch one normalized city from AQICN, falling back to OWM. Does not save.
+    Hedged (see fetch_row_hedged) unless hedge=False or HEDGE_DELAY is None.
+    Why each provider failed is kept in errors (provider -> ProviderError) when given.
+    """
+    if hedge and HEDGE_DELAY is not None:
+        return fetch_row_hedged(city, session, errors=errors)
+    row = fetch_from_aqicn(city, session, errors=errors)
     if row:
-        print(f"Source of data coming: {row['source']},")
-        print(f"🌍 Data successfully fetched by {row['source']} for {city}")
-        save_row(row)
         return row
+    return fetch_from_openweathermap(city, session, errors=errors)
 
-    # Fallback
-    row = fetch_from_openweathermap(city)
+
+def fetch_air_quality(city):
+    city = normalize(city)      # "  South-Delhi " and "south delhi" share one history
+
+    errors = {}
+    row = fetch_row(city, errors=errors)
     if row:
         print(f"Source of data coming: {row['source']},")
         print(f"🌍 Data successfully fetched by {row['source']} for {city}")
@@ -134,15 +388,58 @@ def fetch_air_quality(city):
         return row
 
     print(f"❌ No data available for '{city}' from either API.")
+    for provider, error in sorted(errors.items()):
+        print(f"   ➤ {provider}: {error.category} — {error.detail[:120]}")
     return None
 
 
+# ==========================================================
+# 🔹 Batch Fetch (many cities, pooled connections)
+# ==========================================================
+def fetch_air_quality_many(cities, max_workers=MAX_WORKERS, save=True):
+    """
+    Fetch many cities concurrently over the shared keep-alive session.
+    Returns (results, failures): results maps city -> row, failures maps each city with
+    no data to {provider: error category} for that city's own calls.
+    All new rows are written with one batched append.
+    """
+    names = list(dict.fromkeys(normalize(c) for c in cities if c and c.strip()))
+    session = get_session()
+    results, failures = {}, {}
+    errors = {city: {} for city in names}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(names) or 1))) as pool:
+        futures = {pool.submit(fetch_row, city, session, errors=errors[city]): city for city in names}
+        for fut in as_completed(futures):
+            city = futures[fut]
+            try:
+                row = fut.result()
+            except Exception:
+                row = None
+            if row:
+                results[city] = row
+            else:
+                failures[city] = {p: e.category for p, e in sorted(errors[city].items())}
+
+    print(f"🌍 Fetched {len(results)}/{len(names)} cities ({len(failures)} failed)")
+    if save and results:
+        save_rows([results[c] for c in names if c in results])
+    return results, failures
+
+
 # ==========================================================
 # 🔹 Runner
 # ==========================================================
 if __name__ == "__main__":
-    city = input("Enter city name: ").strip()
-    data = fetch_air_quality(city)
-    if data:
-        print("✅ Latest Data Fetched Successfully:")
-        print(data)
+    city = input("Enter city name (comma-separated for many): ").strip()
+    if "," in city:
+        results, failures = fetch_air_quality_many(city.split(","))
+        if failures:
+            print(f"❌ No data for: {', '.join(failures)}")
+            for name, categories in failures.items():
+                print(f"   ➤ {name}: {', '.join(f'{p} {c}' for p, c in categories.items()) or 'no reading'}")
+    else:
+        data = fetch_air_quality(city)
+        if data:
+            print("✅ Latest Data Fetched Successfully:")
+            print(data)
@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+
+import pandas as pd
+
+from common.names import normalize
+
+INDEX_PATH = "section1Pollution/section1-Pollution/data/geocode_index.json"
+HEALTH_FILE = "section2_Bioknowledge/data/health_dataset_expanded.csv"
+
+
+# ==========================================================
+# 🔹 City → (lat, lon) index persisted as JSON
+# ==========================================================
+class GeocodeIndex:
+    """Local city-name → coordinates map so OWM lookups can skip geo/1.0/direct."""
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._coords = None
+        self._dirty = False
+
+    @staticmethod
+    def _key(city):
+        return normalize(city)     # same key as fetch_air_quality / the pollution store
+
+    def _load(self):
+        if self._coords is None:
+            coords = {}
+            if os.path.exists(self.path) and os.stat(self.path).st_size > 0:
+                with open(self.path, "r") as f:
+                    coords = {self._key(k): tuple(v) for k, v in json.load(f).items()}
+            self._coords = coords
+        return self._coords
+
+    def get(self, city):
+        """Return (lat, lon) or None."""
+        with self._lock:
+            return self._load().get(self._key(city))
+
+    def add(self, city, lat, lon, persist=True):
+        with self._lock:
+            self._load()[self._key(city)] = (float(lat), float(lon))
+            self._dirty = True
+        if persist:
+            self.save()
+
+    def __contains__(self, city):
+        return self.get(city) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._load())
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({k: list(v) for k, v in sorted(self._coords.items())}, f, indent=1)
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+    def load_bulk(self, path):
+        """
+        Merge coordinates from a CSV (columns city, lat, lon) or a JSON object
+        {city: [lat, lon]}. Returns the number of entries loaded.
+        """
+        if path.lower().endswith(".json"):
+            with open(path, "r") as f:
+                items = [(c, v[0], v[1]) for c, v in json.load(f).items()]
+        else:
+            df = pd.read_csv(path)
+            df.columns = df.columns.str.strip().str.lower()
+            df = df.dropna(subset=["city", "lat", "lon"])
+            items = zip(df["city"], df["lat"], df["lon"])
+
+        count = 0
+        for city, lat, lon in items:
+            self.add(city, lat, lon, persist=False)
+            count += 1
+        self.save()
+        return count
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_index():
+    """Return the process-wide GeocodeIndex, creating it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = GeocodeIndex()
+    return _index
+
+
+# ==========================================================
+# 🔹 Bulk warm-up from the health dataset cities
+# ==========================================================
+def warm_up(cities=None, max_workers=8):
+    """Geocode every city missing from the index (default: all cities in the health dataset)."""
+    from concurrent.futures import ThreadPoolExecutor
+    from section1Pollution.scripts.fetch_pollution import geocode_city, get_session
+
+    if cities is None:
+        df = pd.read_csv(HEALTH_FILE)
+        df.columns = df.columns.str.strip().str.lower()
+        cities = df["city"].dropna().astype(str)
+
+    index = get_index()
+    todo = list(dict.fromkeys(GeocodeIndex._key(c) for c in cities))
+    todo = [c for c in todo if c not in index]
+    print(f"🗺️ {len(index)} cities indexed, geocoding {len(todo)} more...")
+
+    session = get_session()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        found = list(pool.map(lambda c: geocode_city(c, session, persist=False), todo))
+    index.save()
+
+    missing = [c for c, coords in zip(todo, found) if coords is None]
+    print(f"✅ Geocode index now holds {len(index)} cities ({len(missing)} not found)")
+    return missing
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 2 and sys.argv[1] == "load":
+        print(f"✅ Loaded {get_index().load_bulk(sys.argv[2])} entries into {INDEX_PATH}")
+    else:
+        warm_up()
@@ -0,0 +1,288 @@
+import math
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from common import metrics
+from common.names import NameIndex
+
+DATA_DIR = "section1Pollution/section1-Pollution/data"
+CSV_PATH = os.path.join(DATA_DIR, "pollution_data.csv")
+STORE_PATH = os.path.join(DATA_DIR, "pollution_store.sqlite")
+
+COLUMNS = ["city", "time", "co", "no2", "o3", "pm2_5", "pm10", "so2", "aqi", "source"]
+NUMERIC_COLUMNS = ["co", "no2", "o3", "pm2_5", "pm10", "so2", "aqi"]
+
+
+def _clean(value):
+    """NaN/None → SQL NULL, numpy scalars → Python scalars."""
+    if value is None:
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+# ==========================================================
+# 🔹 Append-only store with a (city, time) uniqueness index
+# ==========================================================
+class PollutionStore:
+    """
+    SQLite-backed pollution history. Dedup and append are a single indexed
+    INSERT OR IGNORE instead of a full read of pollution_data.csv.
+    Newly inserted rows are mirrored to the CSV with a plain append so existing
+    CSV readers keep working.
+    """
+
+    def __init__(self, path=STORE_PATH, csv_path=CSV_PATH, mirror_csv=True, auto_migrate=True):
+        self.path = path
+        self.csv_path = csv_path
+        self.mirror_csv = mirror_csv
+        self.auto_migrate = auto_migrate
+        self._lock = threading.RLock()
+        self._conn = None
+        self._latest_memo = {}      # city -> row, shared by every reader in this process
+        self._city_index = None     # NameIndex over cities in `latest`, rebuilt after writes
+        self._data_version = None
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS readings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    city TEXT NOT NULL,
+                    time TEXT NOT NULL,
+                    {", ".join(f"{c} REAL" for c in NUMERIC_COLUMNS)},
+                    source TEXT
+                )""")
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_readings_city_time ON readings(city, time)")
+            # Materialized "latest reading per city", maintained on every insert
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS latest (
+                    city TEXT PRIMARY KEY,
+                    reading_id INTEGER NOT NULL
+                )""")
+            if conn.execute("SELECT 1 FROM latest LIMIT 1").fetchone() is None:
+                # SQLite takes the bare id from the row holding MAX(time)
+                conn.execute("""
+                    INSERT INTO latest (city, reading_id)
+                    SELECT key, id FROM (
+                        SELECT lower(city) AS key, id, MAX(time) FROM readings GROUP BY lower(city)
+                    )""")
+            conn.commit()
+            self._conn = conn
+
+            # First open next to an existing CSV: import its history so dedup stays correct
+            empty = conn.execute("SELECT 1 FROM readings LIMIT 1").fetchone() is None
+            if self.auto_migrate and empty and os.path.exists(self.csv_path) and os.stat(self.csv_path).st_size > 0:
+                self.migrate_csv(self.csv_path)
+        return self._conn
+
+    # --- writes ---
+    def _insert(self, db, rows):
+        sql = f"INSERT OR IGNORE INTO readings ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        # A row only becomes the city's latest reading when its station time is newer,
+        # so late or backfilled readings never move get_latest backwards
+        latest_sql = (
+            "INSERT INTO latest (city, reading_id) VALUES (?, ?) "
+            "ON CONFLICT(city) DO UPDATE SET reading_id = excluded.reading_id "
+            "WHERE (SELECT time FROM readings WHERE id = excluded.reading_id)"
+            " > (SELECT time FROM readings WHERE id = latest.reading_id)"
+        )
+        inserted = []
+        for row in rows:
+            values = [_clean(row.get(c)) for c in COLUMNS]
+            cur = db.execute(sql, values)
+            if cur.rowcount == 1:
+                db.execute(latest_sql, (str(values[0]).lower(), cur.lastrowid))
+                inserted.append(row)
+        if inserted:
+            self._latest_memo.clear()
+            self._city_index = None
+        return inserted
+
+    def insert_rows(self, rows, mirror_csv=None):
+        """
+        Insert rows, skipping (city, time) pairs already stored. Returns the rows actually written.
+        mirror_csv overrides the store's CSV mirroring for this call.
+        """
+        rows = list(rows)
+        if not rows:
+            return []
+        with self._lock:
+            db = self._db()
+            with db:
+                inserted = self._insert(db, rows)
+            if inserted and (self.mirror_csv if mirror_csv is None else mirror_csv):
+                self._append_csv(inserted)
+        return inserted
+
+    def _append_csv(self, rows):
+        df = pd.DataFrame(rows).reindex(columns=COLUMNS)
+        fresh = not os.path.exists(self.csv_path) or os.stat(self.csv_path).st_size == 0
+        df.to_csv(self.csv_path, mode="w" if fresh else "a", index=False, header=fresh)
+
+    # --- reads ---
+    def contains(self, city, time):
+        with self._lock:
+            return self._db().execute(
+                "SELECT 1 FROM readings WHERE city = ? AND time = ?", (city, time)
+            ).fetchone() is not None
+
+    def count(self):
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM readings").fetchone()[0]
+
+    def count_between(self, city, start, end):
+        """Readings stored for a city with start <= time < end ("YYYY-MM-DD HH:MM:SS" strings)."""
+        with self._lock:
+            return self._db().execute(
+                "SELECT COUNT(*) FROM readings WHERE city = ? AND time >= ? AND time < ?",
+                (city.strip().lower(), start, end),
+            ).fetchone()[0]
+
+    def get_latest(self, city=None):
+        """
+        Reading with the newest station time for a city (or overall when city is None),
+        as a dict with NaN for missing pollutants. Returns None when nothing is stored.
+        """
+        key = city.strip().lower() if city else None
+        cols = ", ".join(f"r.{c}" for c in COLUMNS)
+        with self._lock:
+            db = self._db()
+            # data_version changes when another process commits; drop the memo then
+            version = db.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._data_version:
+                self._latest_memo.clear()
+                self._city_index = None
+                self._data_version = version
+            if key in self._latest_memo:
+                metrics.cache_lookup("latest", True)
+                return dict(self._latest_memo[key])
+            metrics.cache_lookup("latest", False)
+
+            if key:
+                query = f"SELECT {cols} FROM latest l JOIN readings r ON r.id = l.reading_id WHERE l.city = ?"
+                rec = db.execute(query, (key,)).fetchone()
+                if rec is None:
+                    resolved = self.resolve_city(city)
+                    if resolved is not None:
+                        rec = db.execute(query, (resolved,)).fetchone()
+            else:
+                rec = db.execute(
+                    f"SELECT {cols} FROM latest l JOIN readings r ON r.id = l.reading_id "
+                    "ORDER BY r.time DESC, r.id DESC LIMIT 1"
+                ).fetchone()
+            if rec is None:
+                return None
+            row = dict(zip(COLUMNS, rec))
+            for c in NUMERIC_COLUMNS:
+                if row[c] is None:
+                    row[c] = float("nan")
+            self._latest_memo[key] = row
+            return dict(row)
+
+    def city_index(self):
+        """NameIndex over every city with a stored reading."""
+        with self._lock:
+            if self._city_index is None:
+                cities = [c for (c,) in self._db().execute("SELECT city FROM latest")]
+                self._city_index = NameIndex(cities)
+            return self._city_index
+
+    def resolve_city(self, city):
+        """
+        Stored city key for a free-form name ("South-Delhi", "gurgaon" → "south delhi", "gurugram"), or None.
+        Exact, spacing and alias matches only: a near spelling is a different town
+        ("madhuban" is not Madhubani), and its readings must not be served under this name.
+        """
+        return self.city_index().resolve(city, fuzzy=False)
+
+    def latest_frame(self):
+        """Latest reading for every city as one DataFrame."""
+        cols = ", ".join(f"r.{c}" for c in COLUMNS)
+        with self._lock:
+            return pd.read_sql_query(
+                f"SELECT {cols} FROM latest l JOIN readings r ON r.id = l.reading_id ORDER BY r.id",
+                self._db(),
+            )
+
+    def read_frame(self, city=None):
+        """History as a DataFrame in station-time order (same columns as pollution_data.csv)."""
+        query = f"SELECT {', '.join(COLUMNS)} FROM readings"
+        params = ()
+        if city:
+            query += " WHERE city = ?"
+            params = (city.strip().lower(),)
+        with self._lock:
+            return pd.read_sql_query(query + " ORDER BY time, id", self._db(), params=params)
+
+    # --- migration / export ---
+    def migrate_csv(self, csv_path=CSV_PATH, chunksize=50_000):
+        """Import an existing pollution CSV (deduplicated, original order kept). Returns rows imported."""
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(f"❌ {csv_path} not found.")
+        total = 0
+        with self._lock:
+            db = self._db()
+            for chunk in pd.read_csv(csv_path, dtype={"city": str, "time": str}, chunksize=chunksize):
+                chunk["city"] = chunk["city"].str.strip().str.lower()
+                chunk = chunk.reindex(columns=COLUMNS)
+                with db:
+                    total += len(self._insert(db, chunk.to_dict("records")))
+        return total
+
+    def export_csv(self, path=CSV_PATH, chunksize=100_000):
+        """Write the full history, oldest station time first, with the original pollution_data.csv layout."""
+        tmp = path + ".tmp"
+        query = f"SELECT {', '.join(COLUMNS)} FROM readings ORDER BY time, id"
+        with self._lock:
+            header = True
+            for chunk in pd.read_sql_query(query, self._db(), chunksize=chunksize):
+                chunk.to_csv(tmp, mode="w" if header else "a", index=False, header=header)
+                header = False
+            if header:
+                pd.DataFrame(columns=COLUMNS).to_csv(tmp, index=False)
+        os.replace(tmp, path)
+        return path
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    """Return the process-wide PollutionStore, creating it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PollutionStore()
+    return _store
+
+
+if __name__ == "__main__":
+    import sys
+    cmd = sys.argv[1] if len(sys.argv) > 1 else ""
+    if cmd == "migrate":
+        src = sys.argv[2] if len(sys.argv) > 2 else CSV_PATH
+        store = PollutionStore(mirror_csv=False, auto_migrate=False)
+        print(f"✅ Migrated {store.migrate_csv(src)} new rows from {src} into {STORE_PATH}")
+    elif cmd == "export":
+        dst = sys.argv[2] if len(sys.argv) > 2 else CSV_PATH
+        print(f"📄 Exported {get_store().count()} rows to {get_store().export_csv(dst)}")
+    else:
+        print("Usage: python -m section1Pollution.scripts.pollution_store [migrate [csv] | export [csv]]")
@@ -0,0 +1,245 @@
+#Purpose: Per-provider health (error rate, rolling p95 latency, error categories) and circuit breakers for the pollution APIs.
+
+import itertools
+import threading
+import time
+from collections import deque
+
+from common import metrics
+
+# Error categories reported by the fetchers (provider_requests_total{outcome=...})
+TIMEOUT = "timeout"                 # no response within the request timeout
+CONNECTION = "connection"           # DNS / refused / reset
+HTTP_STATUS = "http_status"         # non-200 response (status kept in the detail)
+UNKNOWN_STATION = "unknown_station" # provider has no station / coordinates for the city
+QUOTA = "quota"                     # rate limit or daily quota exhausted
+AUTH = "auth"                       # missing or rejected API key
+BAD_RESPONSE = "bad_response"       # 200 with a body we cannot read
+CIRCUIT_OPEN = "circuit_open"       # refused locally by an open breaker (never recorded by it)
+
+# Errors that say nothing about the provider's health: the city is simply not covered
+CITY_ERRORS = {UNKNOWN_STATION}
+
+WINDOW_SECONDS = 300        # calls older than this are forgotten
+WINDOW_CALLS = 100          # ...and at most this many are kept
+MIN_CALLS = 5               # no verdict on fewer calls
+ERROR_RATE_LIMIT = 0.5      # open when half of the recent calls failed
+P95_LATENCY_LIMIT = 8.0     # open when the recent p95 latency exceeds this (seconds)
+COOLDOWN = 30.0             # seconds an open breaker waits before letting one probe through
+QUOTA_COOLDOWN = 600.0      # quota errors will not clear in 30 s
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class ProviderError(Exception):
+    """A failed provider call with its category (one of the constants above)."""
+
+    def __init__(self, provider, category, detail=""):
+        super().__init__(f"{provider}: {category}{f' ({detail})' if detail else ''}")
+        self.provider = provider
+        self.category = category
+        self.detail = detail
+
+
+def classify(provider, exc):
+    """Map an exception raised during a provider call onto an error category."""
+    import requests
+
+    if isinstance(exc, ProviderError):
+        return exc
+    if isinstance(exc, requests.Timeout):
+        return ProviderError(provider, TIMEOUT, str(exc))
+    if isinstance(exc, requests.ConnectionError):
+        return ProviderError(provider, CONNECTION, str(exc))
+    return ProviderError(provider, BAD_RESPONSE, f"{type(exc).__name__}: {exc}")
+
+
+def status_error(provider, status_code, detail=""):
+    """Category for a non-200 HTTP response."""
+    if status_code == 429:
+        return ProviderError(provider, QUOTA, f"HTTP {status_code}")
+    if status_code in (401, 403):
+        return ProviderError(provider, AUTH, f"HTTP {status_code}")
+    return ProviderError(provider, HTTP_STATUS, f"HTTP {status_code}{f' {detail}' if detail else ''}")
+
+
+def aqicn_error(message):
+    """Category for an AQICN body with status != "ok" (the reason is a free-text message)."""
+    text = str(message or "").lower()
+    if "unknown station" in text:
+        return ProviderError("aqicn", UNKNOWN_STATION, str(message))
+    if "quota" in text:
+        return ProviderError("aqicn", QUOTA, str(message))
+    if "invalid key" in text or "token" in text:
+        return ProviderError("aqicn", AUTH, str(message))
+    return ProviderError("aqicn", BAD_RESPONSE, str(message))
+
+
+# ==========================================================
+# 🔹 Circuit breaker (one per provider)
+# ==========================================================
+class CircuitBreaker:
+    """
+    Closed: calls go through and their outcome / latency is recorded.
+    Open: calls are refused until the cooldown passes (the fetchers fall through
+    to the other provider). Half-open: one probe call decides whether to close or
+    to open again. allow() hands out a ticket per call so that only the probe's own
+    outcome (not a call started before the breaker opened) gives that verdict.
+    """
+
+    def __init__(self, name, window_seconds=WINDOW_SECONDS, window_calls=WINDOW_CALLS, min_calls=MIN_CALLS,
+                 error_rate_limit=ERROR_RATE_LIMIT, p95_latency_limit=P95_LATENCY_LIMIT, cooldown=COOLDOWN):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate_limit = error_rate_limit
+        self.p95_latency_limit = p95_latency_limit
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.opened_at = None
+        self.open_for = cooldown
+        self.reason = None
+        self._calls = deque(maxlen=window_calls)    # (finished_at, ok, seconds)
+        self._probe = None                          # ticket of the half-open probe in flight
+        self._tickets = itertools.count(1)
+        self._lock = threading.Lock()
+        self.errors = {}                            # category -> count since start
+        self.last_error = None
+
+    def _trim(self, now):
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def _stats(self, now):
+        self._trim(now)
+        calls = len(self._calls)
+        failed = sum(1 for _, ok, _ in self._calls if not ok)
+        latencies = sorted(s for _, _, s in self._calls)
+        p95 = latencies[min(calls - 1, int(0.95 * calls))] if calls else None
+        return calls, (failed / calls if calls else 0.0), p95
+
+    def _open(self, now, reason, cooldown=None):
+        self.state = OPEN
+        self.opened_at = now
+        self.open_for = cooldown or self.cooldown
+        self.reason = reason
+        self._probe = None
+        metrics.inc("circuit_transitions_total", provider=self.name, state=OPEN)
+        print(f"🔌 {self.name} circuit open for {self.open_for:.0f}s: {reason}")
+
+    def _close(self):
+        self.state = CLOSED
+        self.opened_at = None
+        self.reason = None
+        self._probe = None
+        self._calls.clear()
+        metrics.inc("circuit_transitions_total", provider=self.name, state=CLOSED)
+        print(f"🔌 {self.name} circuit closed")
+
+    def available(self):
+        """Whether a call would currently be let through (does not claim the half-open probe)."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            return self._probe is None and time.time() - self.opened_at >= self.open_for
+
+    def allow(self):
+        """
+        Claim permission for one call: a ticket to hand back to record(), or None while
+        open or while a half-open probe is in flight.
+        """
+        with self._lock:
+            ticket = next(self._tickets)
+            if self.state == CLOSED:
+                return ticket
+            if self._probe is not None or time.time() - self.opened_at < self.open_for:
+                return None
+            self.state = HALF_OPEN
+            self._probe = ticket
+            return ticket
+
+    def record(self, ticket, seconds, error=None):
+        """Outcome of the call allow() gave ticket to. error is a ProviderError, or None on success."""
+        now = time.time()
+        ok = error is None or error.category in CITY_ERRORS
+        with self._lock:
+            if error is not None:
+                self.errors[error.category] = self.errors.get(error.category, 0) + 1
+                self.last_error = {"category": error.category, "detail": error.detail,
+                                   "at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))}
+            self._calls.append((now, ok, seconds))
+
+            if self.state == HALF_OPEN:
+                if ticket != self._probe:
+                    return      # started before the breaker opened: not the probe's verdict
+                if ok and seconds <= self.p95_latency_limit:
+                    self._close()
+                elif error is not None and error.category == QUOTA:
+                    self._open(now, "probe failed (quota exhausted)", QUOTA_COOLDOWN)
+                else:
+                    self._open(now, f"probe failed ({error.category if error else 'slow'})")
+                return
+            if self.state == OPEN:
+                return
+            if error is not None and error.category == QUOTA:
+                self._open(now, "quota exhausted", QUOTA_COOLDOWN)
+                return
+
+            calls, error_rate, p95 = self._stats(now)
+            if calls < self.min_calls:
+                return
+            if error_rate >= self.error_rate_limit:
+                self._open(now, f"{error_rate:.0%} of the last {calls} calls failed")
+            elif p95 is not None and p95 > self.p95_latency_limit:
+                self._open(now, f"p95 latency {p95:.1f}s over the last {calls} calls")
+
+    def snapshot(self):
+        with self._lock:
+            now = time.time()
+            calls, error_rate, p95 = self._stats(now)
+            return {
+                "state": self.state,
+                "reason": self.reason,
+                "retry_in_s": round(max(0.0, self.open_for - (now - self.opened_at)), 1) if self.opened_at else None,
+                "recent_calls": calls,
+                "error_rate": round(error_rate, 3),
+                "p95_latency_s": round(p95, 3) if p95 is not None else None,
+                "errors": dict(self.errors),
+                "last_error": self.last_error,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.state = CLOSED
+            self.opened_at = None
+            self.reason = None
+            self._probe = None
+            self._calls.clear()
+            self.errors.clear()
+            self.last_error = None
+
+
+# ==========================================================
+# 🔹 Shared breakers used by the fetchers
+# ==========================================================
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def breaker(provider):
+    with _breakers_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider)
+        return _breakers[provider]
+
+
+def provider_health():
+    """State, recent error rate / p95 latency and error counts per category for every provider seen so far."""
+    with _breakers_lock:
+        names = sorted(_breakers)
+    return {name: breaker(name).snapshot() for name in names}
+
+
+def reset():
+    with _breakers_lock:
+        for b in _breakers.values():
+            b.reset()
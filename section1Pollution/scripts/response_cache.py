@@ -0,0 +1,240 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from common import metrics
+
+CACHE_DIR = "section1Pollution/section1-Pollution/cache"
+CACHE_PATH = os.path.join(CACHE_DIR, "responses.sqlite")
+
+DEFAULT_TTL = 3600                  # station data only changes hourly
+DEFAULT_MAX_ENTRIES = 2000          # LRU bound (per cache file)
+DEFAULT_STALE_WHILE_REVALIDATE = 0  # seconds a stale entry may still be served (0 = off)
+
+
+# ==========================================================
+# 🔹 Persistent TTL + LRU cache (SQLite file, in-memory front)
+# ==========================================================
+class ResponseCache:
+    """
+    Caches provider responses keyed by (provider, city).
+    Hits are served from an in-memory LRU; the SQLite file keeps entries across runs.
+    With stale_while_revalidate > 0 an expired entry is returned immediately while
+    a background thread refreshes it.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 stale_while_revalidate=DEFAULT_STALE_WHILE_REVALIDATE):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stale_while_revalidate = stale_while_revalidate
+        self._lock = threading.RLock()
+        self._memory = OrderedDict()     # (provider, key) -> (value, stored_at)
+        self._refreshing = set()
+        self._touched = {}               # (provider, key) -> last memory hit not yet written to disk
+        self._conn = None
+
+    # --- storage ---
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    provider TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (provider, key)
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, item, value, stored_at):
+        self._memory[item] = (value, stored_at)
+        self._memory.move_to_end(item)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _flush_touched(self, db):
+        """Write the accessed_at of memory hits to disk, so the disk LRU sees them too."""
+        if self._touched:
+            db.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE provider = ? AND key = ?",
+                [(at, *item) for item, at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    # --- public API ---
+    def lookup(self, provider, key):
+        """Return (value, age_seconds) or None. Does not apply the TTL."""
+        item = (provider, key.strip().lower())
+        with self._lock:
+            if item in self._memory:
+                self._memory.move_to_end(item)
+                value, stored_at = self._memory[item]
+                now = time.time()
+                self._touched[item] = now   # written on the next set() / close()
+                return value, now - stored_at
+
+            db = self._db()
+            rec = db.execute(
+                "SELECT value, stored_at FROM responses WHERE provider = ? AND key = ?", item
+            ).fetchone()
+            if rec is None:
+                return None
+            value, stored_at = json.loads(rec[0]), rec[1]
+            db.execute(
+                "UPDATE responses SET accessed_at = ? WHERE provider = ? AND key = ?",
+                (time.time(), *item),
+            )
+            db.commit()
+            self._remember(item, value, stored_at)
+            return value, time.time() - stored_at
+
+    def get(self, provider, key):
+        """Return the cached value if it is still within the TTL, else None."""
+        hit = self.lookup(provider, key)
+        if hit is None or hit[1] > self.ttl:
+            return None
+        return hit[0]
+
+    def set(self, provider, key, value):
+        item = (provider, key.strip().lower())
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (provider, key, value, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (*item, json.dumps(value, default=str), now, now),
+            )
+            self._flush_touched(db)
+            # LRU eviction on disk: drop the least recently accessed overflow
+            db.execute(
+                "DELETE FROM responses WHERE rowid IN ("
+                "SELECT rowid FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            db.commit()
+            self._remember(item, value, now)
+
+    def invalidate(self, provider=None, key=None):
+        with self._lock:
+            db = self._db()
+            if provider is None:
+                db.execute("DELETE FROM responses")
+                self._memory.clear()
+            elif key is None:
+                db.execute("DELETE FROM responses WHERE provider = ?", (provider,))
+                for item in [i for i in self._memory if i[0] == provider]:
+                    del self._memory[item]
+            else:
+                item = (provider, key.strip().lower())
+                db.execute("DELETE FROM responses WHERE provider = ? AND key = ?", item)
+                self._memory.pop(item, None)
+            db.commit()
+
+    def get_or_fetch(self, provider, key, loader, refresh=None):
+        """
+        Serve (provider, key) from cache, calling loader() on a miss.
+        Stale entries are refreshed in the background with refresh() (default: loader),
+        for loaders tied to the caller's request that must not outlive it.
+        Empty results (None) are never cached so failures are retried next call.
+        """
+        hit = self.lookup(provider, key)
+        if hit is not None:
+            value, age = hit
+            if age <= self.ttl:
+                metrics.inc("cache_requests_total", cache="response", provider=provider, result="hit")
+                return value
+            if age <= self.ttl + self.stale_while_revalidate:
+                metrics.inc("cache_requests_total", cache="response", provider=provider, result="stale")
+                self._refresh_in_background(provider, key, refresh or loader)
+                return value
+
+        metrics.inc("cache_requests_total", cache="response", provider=provider, result="miss")
+        value = loader()
+        if value is not None:
+            self.set(provider, key, value)
+        return value
+
+    def _refresh_in_background(self, provider, key, loader):
+        item = (provider, key.strip().lower())
+        with self._lock:
+            if item in self._refreshing:
+                return
+            self._refreshing.add(item)
+
+        def refresh():
+            try:
+                value = loader()
+                if value is not None:
+                    self.set(provider, key, value)
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(item)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._flush_touched(self._conn)
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+
+# ==========================================================
+# 🔹 Shared instance used by the fetchers
+# ==========================================================
+CACHE_ENABLED = True
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Return the process-wide ResponseCache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
+
+
+def configure_cache(enabled=None, ttl=None, max_entries=None, stale_while_revalidate=None, path=None):
+    """Adjust the shared cache used by fetch_from_aqicn / fetch_from_openweathermap."""
+    global CACHE_ENABLED, _cache
+    if enabled is not None:
+        CACHE_ENABLED = enabled
+    if path is not None:
+        with _cache_lock:
+            if _cache is None or _cache.path != path:
+                if _cache is not None:
+                    _cache.close()
+                _cache = ResponseCache(path=path)
+    cache = get_cache()
+    if ttl is not None:
+        cache.ttl = ttl
+    if max_entries is not None:
+        cache.max_entries = max_entries
+    if stale_while_revalidate is not None:
+        cache.stale_while_revalidate = stale_while_revalidate
+    return cache
+
+
+def cached(provider, key, loader, refresh=None):
+    """get_or_fetch on the shared cache, or a straight call when caching is disabled."""
+    if not CACHE_ENABLED:
+        return loader()
+    return get_cache().get_or_fetch(provider, key, loader, refresh)
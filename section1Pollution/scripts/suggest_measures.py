@@ -1,71 +1,123 @@
 import pandas as pd
-import joblib
 import numpy as np
+from common import metrics
+from common.model_registry import get_predictor
+from section1Pollution.scripts.pollution_store import get_store
 
-def suggest_measures(city_name=None): 
-    # Load latest pollution data
-    df = pd.read_csv("section1Pollution/section1-Pollution/data/pollution_data.csv")
+MODEL_PATH = "section1Pollution/section1-Pollution/models/plantation_model.pkl"
 
-    # ✅ Filter by city if provided 
-    if city_name:
-        city_name = city_name.strip().lower()
-        df_city = df[df["city"].str.lower() == city_name]
-        if df_city.empty:
-            raise ValueError(f"❌ No data found for city '{city_name}'. Fetch data first.")
-        latest = df_city.iloc[-1]
+# Features must match training dataset
+FEATURES = ["pm2_5", "pm10", "co", "no2", "so2", "o3"]
+
+# WHO-based thresholds used for the advisories
+PLANTATION_URGENT_TREES = 50
+MASK_PM25 = 37.5
+SAFE_PM25 = 15
+CO_LIMIT = 200
+SO2_LIMIT = 40
+NO2_LIMIT = 25
+
+
+def advisory_table(latest_df, model=None):
+    """
+    Vectorized plantation + advisory engine.
+    One model.predict over every row, thresholds evaluated as boolean masks.
+    Returns one row per input row with trees needed and a flag per advisory.
+    """
+    model = model or get_predictor(MODEL_PATH)
+    latest_df = latest_df.reset_index(drop=True)
+
+    if latest_df.empty:
+        trees = np.array([], dtype=int)
     else:
-        latest = df.iloc[-1]
+        with metrics.timer("model_predict_seconds", model="plantation"):
+            trees = model.predict(latest_df[FEATURES]).astype(int)
+
+    pm25 = latest_df["pm2_5"].to_numpy(dtype=float)
+    co = latest_df["co"].to_numpy(dtype=float)
+    so2 = latest_df["so2"].to_numpy(dtype=float)
+    no2 = latest_df["no2"].to_numpy(dtype=float)
 
+    return pd.DataFrame({
+        "city": latest_df["city"],
+        "time": latest_df["time"],
+        "trees_needed": trees,
+        "plantation_urgent": trees > PLANTATION_URGENT_TREES,
+        "mask_required": pm25 > MASK_PM25,
+        "plantation_drive": pm25 > SAFE_PM25,
+        "reduce_vehicles": co >= CO_LIMIT,
+        "control_industry": so2 >= SO2_LIMIT,
+        "reduce_traffic": no2 >= NO2_LIMIT,
+        "air_excellent": pm25 <= SAFE_PM25,
+    })
+
+
+def measures_from_advice(advice):
+    """Render one advisory_table row as the human-readable measures list."""
     measures = []
-    plantation = None
-    mask_required = "No mask required"
-
-    # --- Load trained ML model ---
-    model = joblib.load("section1Pollution/section1-Pollution/models/plantation_model.pkl")
-
-    # Features must match training dataset 
-    features = pd.DataFrame([{
-        "pm2_5": latest["pm2_5"],
-        "pm10": latest["pm10"],
-        "co": latest["co"],
-        "no2": latest["no2"],
-        "so2": latest["so2"],
-        "o3": latest["o3"]
-    }])
-    
-    predicted_trees = int(model.predict(features)[0])
 
     # --- Plantation Requirement ---
-    if predicted_trees > 50:
-        plantation = f"{predicted_trees} trees per sq km needed"
+    if advice["plantation_urgent"]:
+        plantation = f"{advice['trees_needed']} trees per sq km needed"
     else:
         plantation = "Not urgent (within safe limits)"
-
     measures.append(f"🌳 Plantation Requirement (ML): {plantation}")
 
     # --- Mask recommendation ---
-    if latest["pm2_5"] > 37.5:
-        mask_required = "Wear mask while going outside"
-
+    mask_required = "Wear mask while going outside" if advice["mask_required"] else "No mask required"
     measures.append(f"😷 Mask Advisory: {mask_required}")
 
     # --- Pollution control measures as per WHO Standards ---
-    if latest["pm2_5"] > 15:
+    if advice["plantation_drive"]:
         measures.append("🌿 Encourage plantation drives to reduce PM2.5")
-    if latest["co"] >= 200:
+    if advice["reduce_vehicles"]:
         measures.append("🚗 Reduce vehicle use, promote public transport")
-    if latest["so2"] >= 40:
+    if advice["control_industry"]:
         measures.append("🏭 Control industrial emissions (SO₂ beyond safe limit)")
-    if latest["no2"] >= 25:
+    if advice["reduce_traffic"]:
         measures.append("🚦 Reduce traffic congestion (NO₂ too high)")
 
     # --- Good condition ---
-    if latest["pm2_5"] <= 15:
+    if advice["air_excellent"]:
         measures.append("✅ Air quality is excellent. Maintain greenery!")
 
     return measures
 
 
+def suggest_measures(city_name=None): 
+    # Latest pollution reading from the per-city index
+    if city_name:
+        city_name = city_name.strip().lower()
+        latest = get_store().get_latest(city_name)
+        if latest is None:
+            raise ValueError(f"❌ No data found for city '{city_name}'. Fetch data first.")
+    else:
+        latest = get_store().get_latest()
+        if latest is None:
+            raise ValueError("❌ No pollution data stored yet. Fetch data first.")
+
+    advice = advisory_table(pd.DataFrame([latest])).iloc[0]
+    return measures_from_advice(advice)
+
+
+def suggest_measures_many(cities=None):
+    """
+    Advisory table for a whole region in one pass: latest reading of every
+    requested city (default: every stored city), one predict call, vectorized rules.
+    """
+    store = get_store()
+    latest_df = store.latest_frame()
+    if cities is not None:
+        requested = list(dict.fromkeys(c.strip().lower() for c in cities))
+        resolved = {c: store.resolve_city(c) for c in requested}
+        latest_df = latest_df[latest_df["city"].str.lower().isin(set(resolved.values()))]
+        missing = sorted(c for c, key in resolved.items() if key is None)
+        if missing:
+            print(f"⚠️ No pollution data for: {', '.join(missing)}")
+
+    return advisory_table(latest_df)
+
+
 if __name__ == "__main__":
     for m in suggest_measures():
         print("-", m)
@@ -1,39 +1,36 @@
 # section1_pollution/train_plantation_model.py
 
+import argparse
 import pandas as pd
-from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
-import joblib
 import os
+from common.training import run_training, add_cli_args
 
-# 1. Load dataset
-file_path = "section1Pollution/section1-Pollution/data/plantation_training_data.csv"
-if not os.path.exists(file_path):
-    raise FileNotFoundError(f"❌ Dataset not found at {file_path}. Please place it inside 'section1_pollution/'.")
+DATA_PATH = "section1Pollution/section1-Pollution/data/plantation_training_data.csv"
+MODEL_PATH = "section1Pollution/section1-Pollution/models/plantation_model.pkl"
+FEATURES = ["pm2_5", "pm10", "co", "no2", "so2", "o3"]
 
-df = pd.read_csv(file_path)
 
-# 2. Features & Target
-X = df[["pm2_5", "pm10", "co", "no2", "so2", "o3"]]   
-y = df["trees_needed"]
+def train_plantation_model(search=False, incremental=False, extra_trees=50, n_jobs=-1):
+    """Train the plantation (trees needed) regressor and publish a new model version."""
 
-# 3. Split data
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
+    # 1. Load dataset
+    if not os.path.exists(DATA_PATH):
+        raise FileNotFoundError(f"❌ Dataset not found at {DATA_PATH}. Please place it inside 'section1_pollution/'.")
 
-# 4. Train model (Random Forest for accuracy & interpretability)
-model = RandomForestRegressor(n_estimators=200, random_state=42)
-model.fit(X_train, y_train)
+    df = pd.read_csv(DATA_PATH)
 
-# 5. Save model
-model_path = "section1-Pollution/models/plantation_model.pkl"
-os.makedirs(os.path.dirname(model_path), exist_ok=True) 
+    # 2. Features & Target
+    X = df[FEATURES]
+    y = df["trees_needed"]
 
-joblib.dump(model, model_path)
-
-# 6. Optional: Evaluate accuracy
-score = model.score(X_test, y_test)
-print(f"✅ Model trained successfully | Saved at {model_path} | R² Score: {score:.2f}")
+    # 3-6. Split (cached), train (Random Forest for accuracy & interpretability), evaluate, save
+    return run_training(
+        "plantation_model", X, y, RandomForestRegressor, MODEL_PATH,
+        n_estimators=200, search=search, incremental=incremental, extra_trees=extra_trees, n_jobs=n_jobs,
+    )
 
 
+if __name__ == "__main__":
+    args = add_cli_args(argparse.ArgumentParser(description="Train the plantation model")).parse_args()
+    train_plantation_model(args.search, args.incremental, args.extra_trees, args.jobs)
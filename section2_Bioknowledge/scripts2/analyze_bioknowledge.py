@@ -1,18 +1,145 @@
 import pandas as pd
-import json
+import numpy as np
 import os
-import matplotlib.pyplot as plt
 from section2_Bioknowledge.scripts2.fetch_bioknowledge import fetch_bioknowledge
+from common import metrics
+from common.datasets import health_records, health_ranges as load_health_ranges
+
+HEALTH_RANGES_FILE = "section2_Bioknowledge/utils/health_ranges.json"
+REPORTS_DIR = "section2_Bioknowledge/reports"
+CHART_DIR = "section2_Bioknowledge/reports/charts"
+
+# Dataset column names → our metric names
+COLUMN_RENAMES = {
+    "avg_bp_sys": "blood_pressure_sys",
+    "avg_bp_dia": "blood_pressure_dia",
+    "avg_heart_rate": "heart_rate",
+    "avg_oxygen_level": "oxygen_level"
+}
+
+# health_ranges.json key → metric column
+METRIC_COLUMNS = {
+    "heart_rate": "heart_rate",
+    "blood_pressure_systolic": "blood_pressure_sys",
+    "blood_pressure_diastolic": "blood_pressure_dia",
+    "oxygen_level": "oxygen_level"
+}
+
+STATUS_LABELS = ["LOW", "NORMAL", "HIGH"]
+
+
+def classify_health(df, health_ranges=None):
+    """
+    Vectorized LOW / NORMAL / HIGH classification of every metric for every row.
+    Accepts raw dataset columns (avg_*) or renamed ones. Returns a DataFrame of
+    categorical statuses keyed by the health_ranges.json metric names.
+    """
+    health_ranges = health_ranges or load_health_ranges(HEALTH_RANGES_FILE)
+    df = df.rename(columns=COLUMN_RENAMES)
+
+    keys = list(METRIC_COLUMNS)
+    values = df[[METRIC_COLUMNS[k] for k in keys]].to_numpy(dtype=float)
+    lows = np.array([health_ranges[k]["healthy_min"] for k in keys], dtype=float)
+    highs = np.array([health_ranges[k]["healthy_max"] for k in keys], dtype=float)
+
+    # -1 = LOW, 0 = NORMAL, 1 = HIGH (NaN compares False both ways → NORMAL, as before)
+    codes = (values > highs).astype(np.int8) - (values < lows).astype(np.int8) + 1
+
+    return pd.DataFrame(
+        {k: pd.Categorical.from_codes(codes[:, i], categories=STATUS_LABELS) for i, k in enumerate(keys)},
+        index=df.index,
+    )
+
+
+def health_summary(city, df, health_ranges):
+    """Per-row "value (STATUS)" summary table for one city's renamed vitals."""
+    statuses = classify_health(df, health_ranges)
+
+    # "value (STATUS)" strings for every metric at once
+    result_df = pd.DataFrame({"city": city}, index=df.index)
+    for key, col in METRIC_COLUMNS.items():
+        result_df[key] = df[col].round(2).astype(str) + " (" + statuses[key].astype(str) + ")"
+    return result_df.reset_index(drop=True)
+
+
+class HealthChart:
+    """
+    Reusable "average vs healthy limit" chart on a non-interactive Figure.
+    Each render() clears and redraws the same axes instead of building a new figure.
+    """
+
+    def __init__(self):
+        from matplotlib.figure import Figure
+        self.figure = Figure(figsize=(7, 5))
+        self.ax = self.figure.add_subplot()
+        self._laid_out = False
+
+    @metrics.timed("plot_seconds", step="draw")
+    def draw(self, city, avg_values, healthy_means):
+        ax = self.ax
+        ax.cla()
+        ax.bar(avg_values.index, avg_values.values, alpha=0.7, label=f"{city.capitalize()} Avg")
+        ax.plot(avg_values.index, healthy_means, "r--", label="Healthy Limit")
+        ax.set_title(f"Average Bioknowledge vs Healthy Standards ({city.capitalize()})")
+        ax.set_ylabel("Values")
+        ax.legend()
+        # Same four categories every time, so the layout from the first render is reused
+        if not self._laid_out:
+            self.figure.tight_layout()
+            self._laid_out = True
+
+    @metrics.timed("plot_seconds", step="save")
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.figure.savefig(path)
+        return path
+
+
+def chart_inputs(df, health_ranges):
+    avg_values = df[["heart_rate", "blood_pressure_sys", "blood_pressure_dia", "oxygen_level"]].mean()
+    healthy_means = [
+        health_ranges["heart_rate"]["healthy_max"],
+        health_ranges["blood_pressure_systolic"]["healthy_max"],
+        health_ranges["blood_pressure_diastolic"]["healthy_max"],
+        health_ranges["oxygen_level"]["healthy_max"]
+    ]
+    return avg_values, healthy_means
+
+
+def show_health_chart(city, avg_values, healthy_means):
+    """Interactive pyplot window (GUI backends need the main thread)."""
+    import matplotlib.pyplot as plt
+    with metrics.timer("plot_seconds", step="draw"):
+        plt.figure(figsize=(7, 5))
+        plt.bar(avg_values.index, avg_values.values, alpha=0.7, label=f"{city.capitalize()} Avg")
+        plt.plot(avg_values.index, healthy_means, "r--", label="Healthy Limit")
+        plt.title(f"Average Bioknowledge vs Healthy Standards ({city.capitalize()})")
+        plt.ylabel("Values")
+        plt.legend()
+        plt.tight_layout()
+    plt.show()
+
+
+def show_city_chart(city):
+    """Chart for a city already analyzed elsewhere (tables come from the shared registry)."""
+    df = health_records(city)
+    if df is None:
+        return
+    show_health_chart(city, *chart_inputs(df.rename(columns=COLUMN_RENAMES), load_health_ranges(HEALTH_RANGES_FILE)))
 
-def analyze_city_health(city):
-    """Compares regional bio-data against healthy ranges, prints results, saves report & visualizes."""
+
+def analyze_city_health(city, headless=False, chart_format="png", chart_dir=CHART_DIR, show=True):
+    """
+    Compares regional bio-data against healthy ranges, prints results, saves report & visualizes.
+    headless=True writes the chart to chart_dir as PNG/SVG instead of opening a window.
+    show=False skips the window (callers off the main thread use show_city_chart later).
+    """
     df = fetch_bioknowledge(city)
     if df is None or df.empty:
         return
 
     # Load healthy reference values
-    with open("section2_Bioknowledge/utils/health_ranges.json", "r") as f:
-        health_ranges = json.load(f)
+    health_ranges = load_health_ranges(HEALTH_RANGES_FILE)
 
     print(f"\n🩺 Health Analysis for {city}:\n")
 
@@ -20,68 +147,27 @@ def analyze_city_health(city):
     df.columns = df.columns.str.strip().str.lower()
 
     # Rename according to your dataset columns
-    df = df.rename(columns={
-        "avg_bp_sys": "blood_pressure_sys",
-        "avg_bp_dia": "blood_pressure_dia",
-        "avg_heart_rate": "heart_rate",
-        "avg_oxygen_level": "oxygen_level"
-    })
-
-    report_rows = []
-
-    for _, row in df.iterrows():
-        heart_rate = row["heart_rate"]
-        sys = row["blood_pressure_sys"]
-        dia = row["blood_pressure_dia"]
-        o2 = row["oxygen_level"]
-
-        checks = {
-            "heart_rate": (heart_rate, health_ranges["heart_rate"]),
-            "blood_pressure_systolic": (sys, health_ranges["blood_pressure_systolic"]),
-            "blood_pressure_diastolic": (dia, health_ranges["blood_pressure_diastolic"]),
-            "oxygen_level": (o2, health_ranges["oxygen_level"])
-        }
-
-        summary = {"city": city}
-
-        for key, (value, ref) in checks.items():
-            healthy_min, healthy_max = ref["healthy_min"], ref["healthy_max"]
-            if value < healthy_min:
-                status = "LOW"
-            elif value > healthy_max:
-                status = "HIGH"
-            else:
-                status = "NORMAL"
-            summary[key] = f"{round(value, 2)} ({status})"
-
-        report_rows.append(summary)
-
-    # Create dataframe from summaries
-    result_df = pd.DataFrame(report_rows)
+    df = df.rename(columns=COLUMN_RENAMES)
+
+    result_df = health_summary(city, df, health_ranges)
 
     # ✅ 1️⃣ Show the summary clearly in terminal
     print(result_df.to_string(index=False))
 
     # ✅ 2️⃣ Save the same data to CSV report
-    os.makedirs("section2_Bioknowledge/reports", exist_ok=True)
-    output_path = f"section2_Bioknowledge/reports/{city}_health_summary.csv"
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    output_path = f"{REPORTS_DIR}/{city}_health_summary.csv"
     result_df.to_csv(output_path, index=False)
     print(f"\n📄 Summary saved at: {output_path}")
 
     # ✅ 3️⃣ Visualization section
-    avg_values = df[["heart_rate", "blood_pressure_sys", "blood_pressure_dia", "oxygen_level"]].mean()
-    healthy_means = [
-        health_ranges["heart_rate"]["healthy_max"],
-        health_ranges["blood_pressure_systolic"]["healthy_max"],
-        health_ranges["blood_pressure_diastolic"]["healthy_max"],
-        health_ranges["oxygen_level"]["healthy_max"]
-    ] 
-
-    plt.figure(figsize=(7, 5))
-    plt.bar(avg_values.index, avg_values.values, alpha=0.7, label=f"{city.capitalize()} Avg")
-    plt.plot(avg_values.index, healthy_means, "r--", label="Healthy Limit")
-    plt.title(f"Average Bioknowledge vs Healthy Standards ({city.capitalize()})")
-    plt.ylabel("Values")
-    plt.legend()
-    plt.tight_layout()
-    plt.show()
+    avg_values, healthy_means = chart_inputs(df, health_ranges)
+
+    if headless:
+        chart = HealthChart()
+        chart.draw(city, avg_values, healthy_means)
+        chart_path = chart.save(os.path.join(chart_dir, f"{city}_health_chart.{chart_format}"))
+        print(f"📈 Chart saved at: {chart_path}")
+    elif show:
+        show_health_chart(city, avg_values, healthy_means)
+    return result_df
@@ -1,5 +1,5 @@
-import pandas as pd
 import os
+from common.datasets import health_records, resolve_city, suggest
 
 def fetch_bioknowledge(city_name):
     """
@@ -10,20 +10,17 @@ def fetch_bioknowledge(city_name):
     if not os.path.exists(data_path):
         raise FileNotFoundError(f"❌ Dataset not found at {data_path}")
 
-    df = pd.read_csv(data_path)
-
-    # Normalize column names (case-insensitive + strip spaces)
-    df.columns = df.columns.str.strip().str.lower()
-
-    # Normalize city names too
-    df["city"] = df["city"].str.strip().str.lower() 
-
-    # Filter city (case insensitive) 
-    city_data = df[df["city"] == city_name.lower()]
-
-    if city_data.empty:
+    # Normalized once per process by the dataset registry; spelling/alias differences resolved by the name index
+    key, how = resolve_city(city_name, data_path)
+    if key is None:
         print(f"⚠️ No bioknowledge data found for {city_name}.")
+        hints = suggest("city", city_name)
+        if hints:
+            print(f"🔎 Did you mean: {', '.join(hints)}?")
         return None
+    if how != "exact":
+        print(f"🔎 Using '{key}' for '{city_name}' ({how} match).")
+    city_data = health_records(key, data_path)
 
     print(f"✅ Found {len(city_data)} records for {city_name}.")
     return city_data
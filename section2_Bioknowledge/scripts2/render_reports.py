@@ -0,0 +1,72 @@
+# section2_Bioknowledge/scripts2/render_reports.py
+#Purpose: Headless batch rendering of health charts + summary CSVs for every city, across a process pool.
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from common.datasets import health_records, health_table, health_ranges as load_health_ranges
+from section2_Bioknowledge.scripts2.analyze_bioknowledge import (
+    CHART_DIR, COLUMN_RENAMES, HEALTH_RANGES_FILE, REPORTS_DIR, HealthChart, chart_inputs, health_summary,
+)
+
+# Per-process state, set up once by _init_worker and reused for every city
+_chart = None
+_health_ranges = None
+
+
+def _init_worker():
+    global _chart, _health_ranges
+    import matplotlib
+    matplotlib.use("Agg")
+    _chart = HealthChart()
+    _health_ranges = load_health_ranges(HEALTH_RANGES_FILE)
+
+
+def _render_city(job):
+    city, chart_format, chart_dir, reports_dir = job
+    df = health_records(city)
+    if df is None or df.empty:
+        return city, None, None
+
+    df = df.rename(columns=COLUMN_RENAMES)
+    summary_path = os.path.join(reports_dir, f"{city}_health_summary.csv")
+    health_summary(city, df, _health_ranges).to_csv(summary_path, index=False)
+
+    avg_values, healthy_means = chart_inputs(df, _health_ranges)
+    _chart.draw(city, avg_values, healthy_means)
+    chart_path = _chart.save(os.path.join(chart_dir, f"{city}_health_chart.{chart_format}"))
+    return city, summary_path, chart_path
+
+
+def render_all(cities=None, chart_format="png", workers=None, chart_dir=CHART_DIR, reports_dir=REPORTS_DIR):
+    """
+    Write a summary CSV and a chart (png or svg) for every city in the health dataset
+    (or the given list) using a process pool. Returns {city: (summary_path, chart_path)}.
+    """
+    if cities is None:
+        cities = health_table()["city"].drop_duplicates().tolist()
+    cities = list(dict.fromkeys(c.strip().lower() for c in cities))
+    os.makedirs(chart_dir, exist_ok=True)
+    os.makedirs(reports_dir, exist_ok=True)
+
+    jobs = [(c, chart_format, chart_dir, reports_dir) for c in cities]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 4))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        results = {city: (summary, chart) for city, summary, chart in pool.map(_render_city, jobs, chunksize=chunksize)}
+    elapsed = time.perf_counter() - start
+
+    missing = [c for c, (summary, _) in results.items() if summary is None]
+    print(f"📈 Rendered {len(cities) - len(missing)} cities in {elapsed:.1f}s with {workers} workers → {chart_dir}")
+    if missing:
+        print(f"⚠️ No bioknowledge data for: {', '.join(missing)}")
+    return results
+
+
+if __name__ == "__main__":
+    fmt = sys.argv[1] if len(sys.argv) > 1 else "png"
+    render_all(chart_format=fmt)
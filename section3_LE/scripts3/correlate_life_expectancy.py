@@ -3,21 +3,32 @@
 #Purpose: Correlates pollution + health data → evaluates LE increase/decrease
 
 import pandas as pd 
+import numpy as np
 import os
 from section3_LE.scripts3.fetch_life_expectancy import get_state_from_city, get_base_life_expectancy
+from section1Pollution.scripts.pollution_store import get_store
+from common.datasets import health_records, health_table, base_life_expectancy, resolve_city
 
-POLLUTION_FILE = "section1Pollution/section1-Pollution/data/pollution_data.csv"
 HEALTH_FILE = "section2_Bioknowledge/data/health_dataset_expanded.csv"
+REPORT_FILE = "section3_LE/reports/LE_correlation_report.csv"
+
+REPORT_COLUMNS = [
+    "city", "state", "base_life_expectancy", "environmental_stress(%)",
+    "health_risk_factor(%)", "predicted_LE_change(%)", "predicted_LE(years)"
+]
+
+
+def round1(value):
+    """One decimal, the same way (numpy, half to even) for a scalar and a Series, so both paths agree."""
+    return value.round(1) if isinstance(value, pd.Series) else float(np.round(value, 1))
 
 
 def compute_environmental_stress(city):
     """Compute % stress due to pollution levels."""
-    df = pd.read_csv(POLLUTION_FILE)
-    rec = df[df["city"].str.lower() == city.lower()]
-    if rec.empty:
-        return 0
+    r = get_store().get_latest(city)
+    if r is None:
+        return 0.0
 
-    r = rec.iloc[-1]
     AQI, PM25, PM10, NO2, SO2 = r["aqi"], r["pm2_5"], r["pm10"], r["no2"], r["so2"]
     ES = (
         0.4 * (AQI / 500)
@@ -26,15 +37,14 @@ def compute_environmental_stress(city):
         + 0.1 * (NO2 / 100)
         + 0.1 * (SO2 / 100)
     )
-    return min(round(ES * 100, 1), 100)
+    return min(round1(ES * 100), 100.0)
 
 
 def compute_health_risk_factor(city):
     """Compute % physiological risk due to abnormal bio values."""
-    df = pd.read_csv(HEALTH_FILE)
-    rec = df[df["city"].str.lower() == city.lower()]
-    if rec.empty:
-        return 0
+    rec = health_records(city, HEALTH_FILE)
+    if rec is None:
+        return 0.0
 
     r = rec.iloc[0]
     hr, sys, dia, o2 = r["avg_heart_rate"], r["avg_bp_sys"], r["avg_bp_dia"], r["avg_oxygen_level"]
@@ -45,7 +55,34 @@ def compute_health_risk_factor(city):
     if dia < 60 or dia > 80: risk += 0.15
     if o2 < 95: risk += 0.15
 
-    return min(round(risk * 100, 1), 100)
+    return min(round1(risk * 100), 100.0)
+
+
+def life_expectancy_projection(city, state, base_le):
+    """
+    ES, HRF and predicted LE for one city as a dict (no printing), keyed by the
+    dataset city the name resolves to, as in correlate_all_cities.
+    """
+    ES = compute_environmental_stress(city)
+    HRF = compute_health_risk_factor(city)
+
+    total_penalty = 0.5 * (ES / 100) + 0.5 * (HRF / 100)
+    change_pct = round1(total_penalty * 100 / 2)
+    le_change_years = round1((change_pct / 100) * base_le)
+    predicted_le = round1(base_le - le_change_years)
+
+    return {
+        "city": resolve_city(city)[0] or city.strip().lower(),
+        "state": state,
+        "base_life_expectancy": base_le,
+        "environmental_stress(%)": ES,
+        "health_risk_factor(%)": HRF,
+        "total_penalty": total_penalty,
+        "impact": "Low" if total_penalty < 0.2 else "Moderate" if total_penalty < 0.4 else "High",
+        "predicted_LE_change(%)": change_pct,
+        "predicted_LE_change(years)": le_change_years,
+        "predicted_LE(years)": predicted_le,
+    }
 
 
 def correlate_life_expectancy(city):
@@ -58,13 +95,10 @@ def correlate_life_expectancy(city):
     if not base_le:
         return
 
-    ES = compute_environmental_stress(city)
-    HRF = compute_health_risk_factor(city)
-
-    total_penalty = 0.5 * (ES / 100) + 0.5 * (HRF / 100)
-    change_pct = round(total_penalty * 100 / 2, 1)
-    le_change_years = round((change_pct / 100) * base_le, 1)
-    predicted_le = round(base_le - le_change_years, 1)
+    result = life_expectancy_projection(city, state, base_le)
+    ES, HRF = result["environmental_stress(%)"], result["health_risk_factor(%)"]
+    change_pct, le_change_years = result["predicted_LE_change(%)"], result["predicted_LE_change(years)"]
+    predicted_le = result["predicted_LE(years)"]
 
     print(f"\n🌍 Life Expectancy Analysis for {city.title()}, {state}:")
     print(f"Base Life Expectancy: {base_le} years\n")
@@ -83,21 +117,98 @@ def correlate_life_expectancy(city):
     else:
         print(" - Vital signs within healthy range.\n")
 
-    impact_label = "Low" if total_penalty < 0.2 else "Moderate" if total_penalty < 0.4 else "High"
-    print(f"Combined Risk Impact: {impact_label}")
+    print(f"Combined Risk Impact: {result['impact']}")
     print(f"→ Predicted Life Expectancy may decrease by {change_pct}% (≈ {le_change_years} years drop from baseline)")
     print(f"Predicted Adjusted Life Expectancy: {predicted_le} years\n")
 
-    # Save correlation report  for each city inside same file
-    os.makedirs("section3_LE/reports", exist_ok=True)
-    out_df = pd.DataFrame([{
-        "city": city,
-        "state": state,
-        "base_life_expectancy": base_le,
-        "environmental_stress(%)": ES,
-        "health_risk_factor(%)": HRF,
+    # Save correlation report for each city inside same file (one row per city)
+    upsert_report(pd.DataFrame([result]))
+    print(f"📄 Saved correlation report: {REPORT_FILE}")
+    return result
+
+
+def upsert_report(rows, path=None):
+    """Insert or replace report rows by city, keeping every other city already in the file."""
+    path = path or REPORT_FILE
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rows = rows[REPORT_COLUMNS]
+    if os.path.exists(path) and os.stat(path).st_size > 0:
+        existing = pd.read_csv(path)
+        existing = existing[~existing["city"].astype(str).str.strip().str.lower().isin(rows["city"])]
+        rows = pd.concat([existing, rows], ignore_index=True)
+    tmp = path + ".tmp"
+    rows.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+# ==========================================================
+# 🔹 Batch mode: every city in one vectorized pass
+# ==========================================================
+def correlate_all_cities(cities=None, save=True):
+    """
+    Join latest pollution, health vitals and state LE once and compute ES, HRF
+    and predicted LE as columns for every city (or the given list).
+    Same formulas as the single-city functions. Upserts the report in one write.
+    """
+    health = health_table().drop_duplicates("city", keep="first")
+    if cities is not None:
+        wanted = [resolve_city(c)[0] for c in cities]
+        health = health[health["city"].isin(wanted)]
+
+    # Stored pollution cities mapped onto dataset names (gurgaon → gurugram, spacing, typos)
+    pollution = get_store().latest_frame()
+    names = pollution["city"].drop_duplicates()
+    resolved = dict(zip(names, (resolve_city(c)[0] or c.strip().lower() for c in names)))
+    pollution["city"] = pollution["city"].map(resolved)
+    pollution = pollution.drop_duplicates("city", keep="last")
+    df = health.merge(pollution[["city", "aqi", "pm2_5", "pm10", "no2", "so2"]], on="city", how="left",
+                      indicator="has_pollution")
+
+    states = df["state"].drop_duplicates()
+    df["base_life_expectancy"] = df["state"].map(dict(zip(states, (base_life_expectancy(s) for s in states))))
+    df = df[df["base_life_expectancy"].notna() & (df["base_life_expectancy"] != 0)]
+
+    # --- Environmental stress (0 when the city has no pollution reading) ---
+    es = (
+        0.4 * (df["aqi"] / 500)
+        + 0.25 * (df["pm2_5"] / 250)
+        + 0.15 * (df["pm10"] / 300)
+        + 0.1 * (df["no2"] / 100)
+        + 0.1 * (df["so2"] / 100)
+    )
+    es = np.minimum(round1(es * 100), 100.0)
+    es = es.where(df["has_pollution"] == "both", 0.0)
+
+    # --- Health risk factor ---
+    hr, sys, dia, o2 = df["avg_heart_rate"], df["avg_bp_sys"], df["avg_bp_dia"], df["avg_oxygen_level"]
+    risk = (
+        0.1 * ((hr < 60) | (hr > 100))
+        + 0.15 * ((sys < 90) | (sys > 120))
+        + 0.15 * ((dia < 60) | (dia > 80))
+        + 0.15 * (o2 < 95)
+    )
+    hrf = np.minimum(round1(risk * 100), 100.0)
+
+    total_penalty = 0.5 * (es / 100) + 0.5 * (hrf / 100)
+    change_pct = round1(total_penalty * 100 / 2)
+    le_change_years = round1((change_pct / 100) * df["base_life_expectancy"])
+
+    report = pd.DataFrame({
+        "city": df["city"],
+        "state": df["state"],
+        "base_life_expectancy": df["base_life_expectancy"],
+        "environmental_stress(%)": es,
+        "health_risk_factor(%)": hrf,
         "predicted_LE_change(%)": change_pct,
-        "predicted_LE(years)": predicted_le
-    }])
-    out_df.to_csv("section3_LE/reports/LE_correlation_report.csv", index=False)
-    print("📄 Saved correlation report: section3_LE/reports/LE_correlation_report.csv")
+        "predicted_LE(years)": round1(df["base_life_expectancy"] - le_change_years),
+    }).reset_index(drop=True)
+
+    if save:
+        upsert_report(report)
+        print(f"📄 Saved correlation report for {len(report)} cities: {REPORT_FILE}")
+    return report
+
+
+if __name__ == "__main__":
+    correlate_all_cities()
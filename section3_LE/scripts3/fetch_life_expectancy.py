@@ -3,8 +3,8 @@
 
 # section3_LE/scripts3/fetch_life_expectancy.py
 
-import pandas as pd
 import os
+from common.datasets import state_for_city, base_life_expectancy, resolve_city, resolve_state
 
 HEALTH_FILE = "section2_Bioknowledge/data/health_dataset_expanded.csv"
 STATEWISE_LE_FILE = "section3_LE/data/state_life_expectancy_2017_21_india.csv"
@@ -15,24 +15,20 @@ def get_state_from_city(city_name):
     if not os.path.exists(HEALTH_FILE):
         raise FileNotFoundError(f"❌ Health dataset not found at {HEALTH_FILE}")
 
-    df = pd.read_csv(HEALTH_FILE)
-
-    # Normalize text — lowercase, strip spaces
-    df["city"] = df["city"].astype(str).str.strip().str.lower()
-    df["state"] = df["state"].astype(str).str.strip()
-
-    # Normalize input too
+    # Normalize input
     city_name = city_name.strip().lower()
 
-    match = df[df["city"] == city_name]
+    key, how = resolve_city(city_name, HEALTH_FILE)
+    state_name = state_for_city(key, HEALTH_FILE) if key else None
 
-    if match.empty:
+    if state_name is None:
         print(f"⚠️ No state found for city '{city_name}'. Please check the spelling in dataset.")
         print("📘 Tip: Ensure your 'city' column in health_dataset_expanded.csv contains this name.")
         return None
 
-    state_name = match.iloc[0]["state"]
-    print(f" City '{city_name.title()}' belongs to state '{state_name}'.")
+    if how != "exact":
+        print(f"🔎 Using '{key}' for '{city_name}' ({how} match).")
+    print(f" City '{key.title()}' belongs to state '{state_name}'.")
     return state_name
 
 
@@ -41,31 +37,16 @@ def get_base_life_expectancy(state_name):
     if not os.path.exists(STATEWISE_LE_FILE):
         raise FileNotFoundError(f"❌ Statewise LE dataset not found at {STATEWISE_LE_FILE}")
 
-    df = pd.read_csv(STATEWISE_LE_FILE)
-
-    # Normalize column names (make them lowercase)
-    df.columns = df.columns.str.strip().str.lower()
-
-    # Standardize the column name that may be 'state' or 'State'
-    if "state" not in df.columns: 
-        raise KeyError("❌ 'state' column not found in life expectancy dataset. Please check your CSV headers.")
-
-    # Normalize text values
-    df["state"] = df["state"].astype(str).str.strip().str.lower()
+    # Column checks and the Total / Male+Female choice happen once in the registry
     state_name = state_name.strip().lower()
 
-    rec = df[df["state"] == state_name]
-    if rec.empty:
+    key, how = resolve_state(state_name, STATEWISE_LE_FILE)
+    base_le = base_life_expectancy(key, STATEWISE_LE_FILE) if key else None
+    if base_le is None:
         print(f"⚠️ No life expectancy record found for '{state_name}'.")
         return None
 
-    # Choose which column to use — 'Total' if available, else average of Male/Female
-    if "total" in df.columns:
-        return float(rec.iloc[0]["total"])
-    elif "total_male" in df.columns and "total_female" in df.columns:
-        return float((rec.iloc[0]["total_male"] + rec.iloc[0]["total_female"]) / 2)
-    else:
-        raise KeyError("⚠️ No valid life expectancy value column found (Expected 'Total' or gender-based columns).")
+    return base_le
 
 
 
@@ -1,54 +1,102 @@
 # section4_SoilFertility/scripts4/predict_soil_fertility.py
 
 import pandas as pd
-import joblib
 import os
+from common.datasets import soil_records, soil_table, resolve_district, suggest
+from common import metrics
+from common.model_registry import get_model, get_predictor
 
-def predict_soil_fertility(region_name): 
+DATA_PATH = "section4_SoilFertility/data/soil_fertility.csv"
+MODEL_PATH = "section4_SoilFertility/models/soil_fertility_model.pkl"
+SCALER_PATH = "section4_SoilFertility/models/scaler.pkl"
+
+FEATURE_COLS = ["zn%", "fe%", "cu%", "mn%", "b%", "s%"]
+
+# Labeling rule used by train_soil_model: fertile if ≥ 4 of the 6 nutrients exceed 70%
+NUTRIENT_THRESHOLD = 70
+MIN_NUTRIENTS_ABOVE = 4
+
+ENGINES = ("model", "rule")
+
+
+def fertility_rule(X):
+    """Exact labeling rule as a vectorized mask → 1 (fertile) / 0 for every row."""
+    return ((X[FEATURE_COLS] > NUTRIENT_THRESHOLD).sum(axis=1) >= MIN_NUTRIENTS_ABOVE).astype(int)
+
+
+def _model_predict(X):
+    if not os.path.exists(MODEL_PATH) or not os.path.exists(SCALER_PATH):
+        raise FileNotFoundError("⚠️ Model or scaler not found! Train them first using train_soil_model.py")
+    model = get_predictor(MODEL_PATH)
+    scaler = get_model(SCALER_PATH)
+    with metrics.timer("model_predict_seconds", model="soil_fertility"):
+        return model.predict(scaler.transform(X[FEATURE_COLS])).astype(int)
+
+
+def score_districts(df=None, engine="rule"):
     """
-    Predicts soil fertility of the entered region (district) using trained ML model.
+    Fertility for every row of df (default: the whole soil dataset) in one pass.
+    engine="rule" evaluates the labeling rule directly (no scaler / forest);
+    engine="model" runs the trained classifier.
     """
+    if engine not in ENGINES:
+        raise ValueError(f"❌ Unknown engine '{engine}'. Choose one of {ENGINES}.")
+    df = soil_table(DATA_PATH) if df is None else df
 
-    data_path = "section4_SoilFertility/data/soil_fertility.csv"
-    model_path = "section4_SoilFertility/models/soil_fertility_model.pkl"
-    scaler_path = "section4_SoilFertility/models/scaler.pkl"
+    fertile = fertility_rule(df) if engine == "rule" else _model_predict(df)
+    return pd.DataFrame({
+        "district": df["district"].to_numpy(),
+        "nutrients_above_70": (df[FEATURE_COLS] > NUTRIENT_THRESHOLD).sum(axis=1).to_numpy(),
+        "fertile": fertile,
+    }, index=df.index)
 
-    # ✅ Load dataset
-    if not os.path.exists(data_path):
-        raise FileNotFoundError(f"❌ Dataset not found at {data_path}")
 
-    df = pd.read_csv(data_path)
-    df.columns = [c.strip().lower().replace(" ", "") for c in df.columns]  # normalize
+def check_rule_consistency():
+    """Compare the trained model with the labeling rule over the whole dataset."""
+    df = soil_table(DATA_PATH)
+    rule = fertility_rule(df).to_numpy()
+    model = _model_predict(df)
+    disagree = df.loc[rule != model, ["district"] + FEATURE_COLS].assign(rule=rule[rule != model],
+                                                                           model=model[rule != model])
+    agreement = 1 - len(disagree) / max(len(df), 1)
+    print(f"📊 Model vs rule agreement: {agreement:.2%} ({len(disagree)} of {len(df)} districts differ)")
+    return agreement, disagree
 
-    # ✅ Check if district column exists
-    if "district" not in df.columns:
-        raise KeyError("⚠️ 'District' column not found. Please verify CSV headers.")
 
-    # ✅ Case-insensitive match for region
-    region_data = df[df["district"].str.lower() == region_name.lower()]
+def predict_soil_fertility(region_name, engine="model"): 
+    """
+    Predicts soil fertility of the entered region (district) using trained ML model,
+    or the exact labeling rule with engine="rule". Returns one row per matching district.
+    """
 
-    if region_data.empty:
-        print(f"⚠️ Sorry, no soil data available for region '{region_name}'.")
-        return
+    # ✅ Load dataset (normalized once per process by the dataset registry)
+    if not os.path.exists(DATA_PATH):
+        raise FileNotFoundError(f"❌ Dataset not found at {DATA_PATH}")
 
-    # ✅ Extract nutrient features
-    feature_cols = ["zn%", "fe%", "cu%", "mn%", "b%", "s%"]
-    X = region_data[feature_cols]
+    # ✅ Name-index match for region (case, spacing, renamed districts, typos)
+    key, how = resolve_district(region_name, DATA_PATH)
+    region_data = soil_records(key, DATA_PATH) if key else None
 
-    # ✅ Load model and scaler
-    if not os.path.exists(model_path) or not os.path.exists(scaler_path):
-        raise FileNotFoundError("⚠️ Model or scaler not found! Train them first using train_soil_model.py")
-
-    model = joblib.load(model_path)
-    scaler = joblib.load(scaler_path)
+    if region_data is None:
+        print(f"⚠️ Sorry, no soil data available for region '{region_name}'.")
+        hints = suggest("district", region_name)
+        if hints:
+            print(f"🔎 Did you mean: {', '.join(hints)}?")
+        return
+    if how != "exact":
+        print(f"🔎 Using district '{key}' for '{region_name}' ({how} match).")
 
-    # ✅ Predict
-    X_scaled = scaler.transform(X)
-    prediction = model.predict(X_scaled)[0] 
+    # ✅ Predict every matching row (district names repeat across states)
+    results = score_districts(region_data, engine=engine)
 
     # ✅ Display result
     print(f"\n🌾 Soil Fertility Analysis for region: {region_name.title()}\n")
-    if prediction == 1:
-        print("✅ The soil in this region is **FERTILE** — suitable for cultivation and vegetation growth.")
-    else:
-        print("🚫 The soil in this region is **NOT FERTILE** — needs enrichment and organic treatment.")
+    for i, prediction in enumerate(results["fertile"], start=1):
+        if len(results) > 1:
+            print(f"Record {i} of {len(results)}:")
+        if prediction == 1:
+            print("✅ The soil in this region is **FERTILE** — suitable for cultivation and vegetation growth.")
+        else:
+            print("🚫 The soil in this region is **NOT FERTILE** — needs enrichment and organic treatment.")
+
+    return results.reset_index(drop=True)
@@ -1,13 +1,13 @@
 # section4_SoilFertility/scripts4/train_soil_model.py
 
+import argparse
 import pandas as pd
-from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
-import joblib
 import os
+from common.training import run_training, add_cli_args
+from section4_SoilFertility.scripts4.predict_soil_fertility import fertility_rule, MODEL_PATH, SCALER_PATH
 
-def train_soil_model():
+def train_soil_model(search=False, incremental=False, extra_trees=50, n_jobs=-1):
     """Train an ML model to predict soil fertility based on nutrient composition."""
 
     data_path = "section4_SoilFertility/data/soil_fertility.csv"
@@ -23,25 +23,19 @@ def train_soil_model():
     X = df[["zn%", "fe%", "cu%", "mn%", "b%", "s%"]]
 
     # Create synthetic target: fertile if ≥ 4 nutrients > 70%
-    df["fertile"] = ((X > 70).sum(axis=1) >= 4).astype(int)
+    df["fertile"] = fertility_rule(X)
     y = df["fertile"]
 
-    # Train-test split
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-    # ✅ Scaling and model training
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
-    model.fit(X_train_scaled, y_train) 
-
-    # Save model and scaler
+    # Split (cached), scaling and multi-core model training, versioned save
     os.makedirs("section4_SoilFertility/models", exist_ok=True)
-    joblib.dump(model, "section4_SoilFertility/models/soil_fertility_model.pkl")
-    joblib.dump(scaler, "section4_SoilFertility/models/scaler.pkl")
+    report = run_training(
+        "soil_fertility_model", X, y, RandomForestClassifier, MODEL_PATH, scaler_path=SCALER_PATH,
+        n_estimators=100, search=search, incremental=incremental, extra_trees=extra_trees, n_jobs=n_jobs,
+    )
 
     print("✅ Soil Fertility Model trained and saved successfully!")
+    return report
 
 if __name__ == "__main__":
-    train_soil_model()
+    args = add_cli_args(argparse.ArgumentParser(description="Train the soil fertility model")).parse_args()
+    train_soil_model(args.search, args.incremental, args.extra_trees, args.jobs)
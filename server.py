@@ -0,0 +1,222 @@
+# server.py-ENV-Int_Project
+#Purpose: Long-running local HTTP service returning JSON from all four sections with datasets and models kept warm.
+
+import argparse
+import json
+import math
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+import pandas as pd
+
+from common import datasets, metrics
+from common.model_registry import preload, model_stats
+from section1Pollution.scripts.analyze_pollution import classify_air_quality
+from section1Pollution.scripts.fetch_pollution import fetch_air_quality
+from section1Pollution.scripts.pollution_store import get_store
+from section1Pollution.scripts.provider_health import provider_health
+from section1Pollution.scripts.suggest_measures import advisory_table, measures_from_advice
+from section2_Bioknowledge.scripts2.analyze_bioknowledge import classify_health, COLUMN_RENAMES
+from section3_LE.scripts3.correlate_life_expectancy import life_expectancy_projection
+from section4_SoilFertility.scripts4.predict_soil_fertility import score_districts
+
+HOST = "127.0.0.1"
+PORT = 8000
+
+
+class NotFound(Exception):
+    pass
+
+
+def _jsonable(value):
+    """numpy / pandas scalars → JSON types, NaN → null."""
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _records(df):
+    return [_jsonable(r) for r in df.to_dict("records")]
+
+
+# ==========================================================
+# 🔹 Section handlers (quiet versions of the CLI sections)
+# ==========================================================
+def pollution_section(city, refresh=False):
+    if refresh:
+        fetch_air_quality(city)
+    latest = get_store().get_latest(city)
+    if latest is None:
+        raise NotFound(f"No pollution data for '{city}'. Request with ?refresh=1 to fetch it.")
+
+    section = {"latest": latest}
+    if not pd.isna(latest["aqi"]):
+        section["aqi"] = int(latest["aqi"])
+        section["status"] = classify_air_quality(int(latest["aqi"]))
+    try:
+        advice = advisory_table(pd.DataFrame([latest])).iloc[0]
+        section["advisory"] = advice.to_dict()
+        section["measures"] = measures_from_advice(advice)
+    except FileNotFoundError as e:
+        section["measures_error"] = str(e)
+    return section
+
+
+def health_section(city):
+    df = datasets.health_records(city)
+    if df is None:
+        raise NotFound(f"No bioknowledge data for '{city}'.")
+    df = df.rename(columns=COLUMN_RENAMES)
+    statuses = classify_health(df)
+    rows = df.drop(columns=["city"]).join(statuses.astype(str).add_suffix("_status"))
+    return {"records": _records(rows)}
+
+
+def life_expectancy_section(city):
+    state = datasets.state_for_city(city)
+    if state is None:
+        raise NotFound(f"No state found for '{city}'.")
+    base_le = datasets.base_life_expectancy(state)
+    if not base_le:
+        raise NotFound(f"No life expectancy record for state '{state}'.")
+    return life_expectancy_projection(city, state, base_le)
+
+
+def soil_section(city, engine="model"):
+    region = datasets.soil_records(city)
+    if region is None:
+        raise NotFound(f"No soil data for '{city}'.")
+    return {"engine": engine, "records": _records(score_districts(region, engine=engine))}
+
+
+SECTIONS = {
+    "pollution": lambda city, q: pollution_section(city, refresh=q.get("refresh") == "1"),
+    "health": lambda city, q: health_section(city),
+    "life-expectancy": lambda city, q: life_expectancy_section(city),
+    "soil": lambda city, q: soil_section(city, engine=q.get("engine", "model")),
+}
+
+
+def city_report(city, query):
+    """
+    Every section for one city. A section that is missing or fails is reported in its
+    own entry instead of failing the whole report; the other sections are still returned.
+    """
+    report = {"city": city}
+    for name, handler in SECTIONS.items():
+        try:
+            report[name] = handler(city, query)
+        except NotFound as e:
+            report[name] = {"error": str(e)}
+        except Exception as e:
+            metrics.inc("report_section_errors_total", section=name)
+            report[name] = {"error": f"{type(e).__name__}: {e}"}
+    return report
+
+
+# ==========================================================
+# 🔹 HTTP layer
+# ==========================================================
+class Handler(BaseHTTPRequestHandler):
+    server_version = "EnvIntel/1.0"
+
+    def _send(self, status, payload, content_type="application/json"):
+        if isinstance(payload, str):
+            body = payload.encode()
+        else:
+            body = json.dumps(_jsonable(payload), default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+
+        if parts == ["metrics"]:
+            return self._send(200, metrics.to_prometheus(), "text/plain; version=0.0.4")
+        if parts == ["metrics.json"]:
+            return self._send(200, metrics.snapshot())
+
+        # Label by route, never by city, to keep metric cardinality bounded
+        endpoint = parts[-1] if parts and parts[-1] in (*SECTIONS, "report", "healthz") else "other"
+        try:
+            with metrics.trace(self.path) as trace, metrics.timer("http_request_seconds", endpoint=endpoint):
+                payload = self._route(parts, query, url)
+        except NotFound as e:
+            metrics.inc("http_requests_total", endpoint=endpoint, status=404)
+            return self._send(404, {"error": str(e)})
+        except ValueError as e:
+            metrics.inc("http_requests_total", endpoint=endpoint, status=400)
+            return self._send(400, {"error": str(e)})
+        except Exception as e:
+            metrics.inc("http_requests_total", endpoint=endpoint, status=500)
+            return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+        metrics.inc("http_requests_total", endpoint=endpoint, status=200)
+        if isinstance(payload, dict):
+            payload.setdefault("elapsed_ms", round((time.perf_counter() - start) * 1000, 2))
+            if query.get("trace") == "1":
+                payload["trace"] = trace
+        self._send(200, payload)
+
+    def _route(self, parts, query, url):
+        if parts == ["healthz"]:
+            return {"ok": True, "models": model_stats(), "providers": provider_health()}
+        if len(parts) == 3 and parts[0] == "city" and parts[2] == "report":
+            return city_report(parts[1].strip().lower(), query)
+        if len(parts) == 3 and parts[0] == "city" and parts[2] in SECTIONS:
+            return SECTIONS[parts[2]](parts[1].strip().lower(), query)
+        if len(parts) == 1 and parts[0] in SECTIONS:
+            if not query.get("city"):
+                raise ValueError("Missing ?city= parameter.")
+            return SECTIONS[parts[0]](query["city"].strip().lower(), query)
+        raise NotFound(f"Unknown endpoint '{url.path}'.")
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def warm_up():
+    """Load every dataset and model once so the first request is as fast as the rest."""
+    start = time.perf_counter()
+    datasets.health_table()
+    datasets.state_le_table()
+    datasets.health_ranges()
+    datasets.soil_table()
+    get_store().get_latest()
+    preload()
+    print(f"🔥 Warm caches ready in {time.perf_counter() - start:.2f}s")
+
+
+def serve(host=HOST, port=PORT):
+    warm_up()
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    httpd.daemon_threads = True
+    print(f"🌐 Serving on http://{host}:{port}  (GET /city/<name>/report, /pollution, /health, /life-expectancy, /soil)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Environmental Intelligence HTTP service")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+    serve(args.host, args.port)
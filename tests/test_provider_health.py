@@ -0,0 +1,161 @@
+# tests/test_provider_health.py
+#Purpose: Circuit breaker state machine — error-rate / latency / quota opening and the ticketed half-open probe.
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from section1Pollution.scripts import provider_health
+from section1Pollution.scripts.provider_health import (
+    CLOSED, COOLDOWN, HALF_OPEN, OPEN, QUOTA, QUOTA_COOLDOWN, TIMEOUT, UNKNOWN_STATION,
+    CircuitBreaker, ProviderError,
+)
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(provider_health, "time",
+                        SimpleNamespace(time=clock, strftime=time.strftime, localtime=time.localtime))
+    return clock
+
+
+def error(category=TIMEOUT):
+    return ProviderError("test", category, "detail")
+
+
+def call(b, seconds=0.1, err=None):
+    ticket = b.allow()
+    assert ticket is not None
+    b.record(ticket, seconds, err)
+
+
+def tripped(b, clock):
+    """A breaker opened by failures, with its cooldown just over."""
+    for _ in range(b.min_calls):
+        call(b, err=error())
+    assert b.state == OPEN
+    clock.advance(COOLDOWN + 1)
+    return b
+
+
+def test_opens_on_error_rate(clock):
+    b = CircuitBreaker("test")
+    for _ in range(3):
+        call(b)
+    for _ in range(2):
+        call(b, err=error())
+    assert b.state == CLOSED                # 2 of 5 failed
+    call(b, err=error())
+    assert b.state == OPEN                  # 3 of 6 ≥ ERROR_RATE_LIMIT
+    assert b.allow() is None
+
+
+def test_no_verdict_below_min_calls(clock):
+    b = CircuitBreaker("test")
+    for _ in range(b.min_calls - 1):
+        call(b, err=error())
+    assert b.state == CLOSED
+
+
+def test_city_errors_do_not_count_as_failures(clock):
+    b = CircuitBreaker("test")
+    for _ in range(10):
+        call(b, err=error(UNKNOWN_STATION))
+    assert b.state == CLOSED
+    assert b.snapshot()["errors"] == {UNKNOWN_STATION: 10}
+
+
+def test_opens_on_p95_latency(clock):
+    b = CircuitBreaker("test")
+    for _ in range(b.min_calls):
+        call(b, seconds=b.p95_latency_limit + 1)
+    assert b.state == OPEN
+    assert "p95" in b.reason
+
+
+def test_quota_error_opens_with_quota_cooldown(clock):
+    b = CircuitBreaker("test")
+    call(b, err=error(QUOTA))
+    assert b.state == OPEN
+    assert b.open_for == QUOTA_COOLDOWN
+    clock.advance(COOLDOWN + 1)
+    assert b.allow() is None
+    clock.advance(QUOTA_COOLDOWN)
+    assert b.allow() is not None
+    assert b.state == HALF_OPEN
+
+
+def test_available_does_not_claim_the_probe(clock):
+    b = tripped(CircuitBreaker("test"), clock)
+    assert b.available()
+    assert b.available()
+    assert b.allow() is not None
+    assert not b.available()
+
+
+def test_probe_success_closes(clock):
+    b = tripped(CircuitBreaker("test"), clock)
+    probe = b.allow()
+    assert b.state == HALF_OPEN
+    assert b.allow() is None                # one probe at a time
+    b.record(probe, 0.1)
+    assert b.state == CLOSED
+    assert b.allow() is not None
+
+
+def test_slow_or_failed_probe_reopens(clock):
+    b = tripped(CircuitBreaker("test"), clock)
+    b.record(b.allow(), b.p95_latency_limit + 1)
+    assert b.state == OPEN
+    assert b.open_for == COOLDOWN
+
+    clock.advance(COOLDOWN + 1)
+    b.record(b.allow(), 0.1, error())
+    assert b.state == OPEN
+
+
+def test_probe_quota_failure_reopens_with_quota_cooldown(clock):
+    b = tripped(CircuitBreaker("test"), clock)
+    b.record(b.allow(), 0.1, error(QUOTA))
+    assert b.state == OPEN
+    assert b.open_for == QUOTA_COOLDOWN
+    clock.advance(COOLDOWN + 1)
+    assert b.allow() is None
+
+
+def test_stale_ticket_does_not_decide_half_open(clock):
+    b = CircuitBreaker("test")
+    stale = b.allow()                       # in flight while the breaker opens
+    tripped(b, clock)
+    probe = b.allow()
+    assert b.state == HALF_OPEN
+
+    b.record(stale, 0.1)                    # a late success is not the probe's verdict
+    assert b.state == HALF_OPEN
+    assert b.allow() is None                # ...and does not free the probe slot
+    b.record(probe, 0.1, error())
+    assert b.state == OPEN
+
+
+def test_stale_failure_does_not_reopen_after_probe(clock):
+    b = CircuitBreaker("test")
+    stale = b.allow()
+    tripped(b, clock)
+    probe = b.allow()
+    b.record(stale, 0.1, error())
+    assert b.state == HALF_OPEN
+    b.record(probe, 0.1)
+    assert b.state == CLOSED